@@ -6,10 +6,12 @@ import os
 import tomllib
 
 # ---- Tick clock (Unchanged) ----
-_SERVER_START = time.monotonic()
+# Milliseconds since server start, wrapped to 32 bits.
+# Integer nanoseconds: no float multiply / int() round trip per call.
+_SERVER_START_NS = time.monotonic_ns()
 
 def get_ticks() -> int:
-    return int((time.monotonic() - _SERVER_START) * 1000) & 0xFFFFFFFF
+    return ((time.monotonic_ns() - _SERVER_START_NS) // 1_000_000) & 0xFFFFFFFF
 
 # ---- Config Sections ----
 
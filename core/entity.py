@@ -20,6 +20,20 @@ class UpdateMask(IntFlag):
     # Bit 9: Hard Sync (Forces position snap, no interpolation)
     HARD_SYNC  = 1 << 9 
 
+# UpdateMask bits as plain ints for the hot paths. '&' / '|' against an
+# IntFlag member runs enum's Python-level operators (~50x a plain int op),
+# so pending_mask is kept as a plain int and tested against these.
+MASK_DEFINITION = int(UpdateMask.DEFINITION)
+MASK_POS        = int(UpdateMask.POS)
+MASK_VEL        = int(UpdateMask.VEL)
+MASK_ROT        = int(UpdateMask.ROT)
+MASK_SPIN       = int(UpdateMask.SPIN)
+MASK_HEALTH     = int(UpdateMask.HEALTH)
+MASK_WEAPON     = int(UpdateMask.WEAPON)
+MASK_ENERGY     = int(UpdateMask.ENERGY)
+MASK_OWNER      = int(UpdateMask.OWNER)
+MASK_HARD_SYNC  = int(UpdateMask.HARD_SYNC)
+
 @dataclass
 class GameEntity:
     net_id: int
@@ -47,12 +61,16 @@ class GameEntity:
 
     def mark_dirty(self, mask: UpdateMask):
         """Flag specific fields to be sent in the next update."""
-        self.pending_mask |= mask
+        self.pending_mask |= int(mask)
 
     def clear_dirty(self):
         """Reset flags after packet is sent."""
         self.pending_mask = 0
 
+    def clear_dirty_bits(self, mask: int):
+        """Clear only 'mask'. Bits marked since it was read stay pending."""
+        self.pending_mask &= ~mask
+
     def set_pos(self, x, y, z):
         self.pos = (x, y, z)
         # Usually when pos changes, we want a hard sync or standard pos update
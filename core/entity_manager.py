@@ -1,9 +1,12 @@
 # core/entity_manager.py
 from typing import Dict, List, Optional
-from core.entity import GameEntity, UpdateMask
+from core.entity import GameEntity, UpdateMask, MASK_DEFINITION, MASK_POS, MASK_HEALTH
 from network.packets.update_array import UpdateArrayPacket
 from network.packets.gameplay import DeleteObjectPacket
 
+# The mask we want for a full snapshot (Pos + Health + Def)
+_SNAPSHOT_MASK = MASK_POS | MASK_HEALTH | MASK_DEFINITION
+
 class EntityManager:
     def __init__(self):
         self._entities: Dict[int, GameEntity] = {}
@@ -50,6 +53,20 @@ class EntityManager:
         """Returns a list of all entities that have changed this tick."""
         return [e for e in self._entities.values() if e.pending_mask > 0]
 
+    def take_dirty_snapshot(self) -> Dict[int, tuple[GameEntity, int]]:
+        """
+        Returns {net_id: (entity, mask)} for every dirty entity and clears
+        exactly the bits captured. Anything marked dirty after this call
+        (e.g. by the UDP thread mid-broadcast) stays pending for the next tick.
+        """
+        snapshot = {}
+        for e in list(self._entities.values()):
+            mask = e.pending_mask
+            if mask:
+                e.clear_dirty_bits(mask)
+                snapshot[e.net_id] = (e, mask)
+        return snapshot
+
     def clear_all_dirty_flags(self):
         """Clears dirty flags for all entities. Call this AT THE END of a tick."""
         for e in self._entities.values():
@@ -59,11 +76,17 @@ class EntityManager:
 
     def build_update_packet(self, entities: List[GameEntity], sequence_num: int, 
                            is_view_update: bool, 
-                           local_stats: tuple[float, float] | None = None) -> Optional[bytes]:
+                           local_stats: tuple[float, float] | None = None,
+                           record_cache: dict | None = None,
+                           masks: Dict[int, int] | None = None) -> Optional[bytes]:
         """
         Constructs the payload for an UpdateArrayPacket.
         Crucially, this does NOT clear dirty flags, allowing you to reuse 
         the dirty state for multiple clients.
+        masks: optional {net_id: mask} (e.g. from take_dirty_snapshot) used
+        instead of each entity's live pending_mask.
+        Pass the same record_cache dict for every client in a tick so each
+        entity is only quantized and packed once (see UpdateArrayPacket.get_bytes).
         """
         # If no entities changed and we aren't forcing local stats (like a heartbeat), return None
         if not entities and not local_stats:
@@ -77,11 +100,13 @@ class EntityManager:
             
         # 2. Add Entities
         for entity in entities:
+             mask = masks[entity.net_id] if masks is not None else entity.pending_mask
              # If the DEFINITION bit is set, we must tell the packet to write the full spawn info
-             force_spawn = bool(entity.pending_mask & UpdateMask.DEFINITION)
-             packet.add_entity(entity, force_spawn=force_spawn)
+             force_spawn = bool(mask & MASK_DEFINITION)
+             packet.add_entity(entity, force_spawn=force_spawn,
+                               forced_mask=mask if masks is not None else None)
 
-        return packet.get_bytes()
+        return packet.get_bytes(record_cache)
 
     def get_snapshot_packet(self, sequence_num: int, health: float = 1.0, energy: float = 1.0) -> bytes:
         """
@@ -93,16 +118,12 @@ class EntityManager:
         # Tell the client it is alive
         packet.set_local_stats(health=health, energy=energy)
 
-        # Define the mask we want for a full snapshot (Pos + Health + Def)
-        snapshot_mask = UpdateMask.POS | UpdateMask.HEALTH | UpdateMask.DEFINITION
-        
-        for entity in self._entities.values():
-            # Pass the mask explicitly. Do NOT touch entity.pending_mask.
-            packet.add_entity(
-                entity, 
-                force_spawn=True, 
-                forced_mask=snapshot_mask
-            )
+        # Pass the snapshot mask explicitly. Do NOT touch entity.pending_mask.
+        packet.add_entities(
+            self._entities.values(), 
+            force_spawn=True, 
+            forced_mask=_SNAPSHOT_MASK
+        )
 
         return b'\x0F' + packet.get_bytes()
 
@@ -123,8 +144,7 @@ class EntityManager:
         packet = UpdateArrayPacket(sequence_id=sequence_num, is_view_update=False)
         packet.set_local_stats(health=health, energy=energy)
         
-        for entity in dirty_entities:
-            packet.add_entity(entity, force_spawn=False)
+        packet.add_entities(dirty_entities, force_spawn=False)
 
         payload = packet.get_bytes()
 
@@ -152,8 +172,7 @@ class EntityManager:
         packet = UpdateArrayPacket(sequence_id=sequence_num, is_view_update=True)
         packet.set_local_stats(health=health, energy=energy)
         
-        for entity in dirty_entities:
-            packet.add_entity(entity, force_spawn=False)
+        packet.add_entities(dirty_entities, force_spawn=False)
 
         payload = packet.get_bytes()
 
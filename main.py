@@ -12,6 +12,7 @@ from typing import Dict, Tuple, Optional
 
 from network.transport.tcp_transport import TcpTransport
 from network.transport.udp_transport import UdpTransport
+from network.transport.envelope import TcpEnvelope
 
 from network.dispatcher import PacketDispatcher
 from network.streams import PacketWriter, PacketReader
@@ -27,7 +28,7 @@ from network.packets import (
     TankPacket, BehaviorPacket, TranslationPacket,
     UpdateStatsPacket, CommMessagePacket,
 )
-from network.packets.packet_logger import PacketLogger, log_packet
+from network.packets.packet_logger import PacketLogger, log_packet, get_default_logger
 
 from core.entity import GameEntity, UpdateMask
 from core.entity_manager import EntityManager
@@ -104,7 +105,8 @@ class WulframServerContext:
     def __init__(self):
         self.cfg = Config.load()
         self.packet_cfg = PacketConfig.load("packets.toml")
-        self.logger = PacketLogger()
+        self.logger = PacketLogger(enabled=self.cfg.debug.debug_packets)
+        get_default_logger().enabled = self.cfg.debug.debug_packets
         self.entities = EntityManager()
         self.first_map_load = False
         self.current_map_name = self.cfg.game.map_name
@@ -167,23 +169,31 @@ class WulframServerContext:
             print("[UDP-ERR] Transport not initialized, stopping UDP loop.")
             return
         
-        while not self.stop_event.is_set():
+        # Bound once: these run for every datagram
+        is_stopped = self.stop_event.is_set
+        recv = transport.recv
+        udp_sessions = self.udp_sessions
+        parse_datagram = transport.parse_datagram
+        dispatch_payload = dispatcher.dispatch_payload
+
+        while not is_stopped():
             try:
-                data, addr = self.udp_sock.recvfrom(2048)
+                # 'data' views the transport's reused buffer; handlers run to
+                # completion before the next recv, so nothing is copied
+                data, addr = recv()
                 
                 # Get or Create UDP Session Context
-                if addr not in self.udp_sessions:
+                ctx = udp_sessions.get(addr)
+                if ctx is None:
                     # KEY CHANGE: Do not try to match by IP. 
                     # Create a "Sessionless" context. The Session Key (Hello Packet) 
                     # will link this context to a player later.
                     ctx = UdpContext(transport, addr, self, session=None)
-                    self.udp_sessions[addr] = ctx
+                    udp_sessions[addr] = ctx
                     # print(f"[UDP] New connection from {addr} (Unverified)")
 
-                ctx = self.udp_sessions[addr]
-
-                for packet_payload in transport.parse_datagram(data):
-                    dispatcher.dispatch_payload(ctx, packet_payload)
+                for packet_payload in parse_datagram(data):
+                    dispatch_payload(ctx, packet_payload)
 
             except Exception as e:
                 print(f"[UDP-ERR] {e}") # Optional: reduce spam
@@ -274,20 +284,22 @@ class TcpContext:
         else:
             payload = packet_data
 
-        packet_len = len(payload) + 2
-        header = struct.pack(">H", packet_len)
-        
         try:
-            self.transport.sock.sendall(header + payload)
-            self.server.logger.log_packet(
-                "TCP-SEND", 
-                payload, 
-                show_ascii=self.server.cfg.debug.show_ascii, 
-                include_tcp_len_prefix=True
-            )
+            self.transport.send_payload(payload)
+            logger = self.server.logger
+            if logger.enabled:
+                logger.log_packet(
+                    "TCP-SEND", 
+                    payload, 
+                    show_ascii=self.server.cfg.debug.show_ascii, 
+                    include_tcp_len_prefix=True
+                )
         except OSError as e:
             print(f"[TCP-ERR] Failed to send packet: {e}")
 
+# Reliable ACK body (0x02): [Our Seq] [Len=9] [SubCmd] [Acking Packet ID] [Acking Seq Num]
+_ACK_STRUCT = struct.Struct(">HHBBH")
+
 class UdpContext:
     """Context for a UDP Endpoint (Sessionless or Session-bound)"""
     def __init__(self, transport: UdpTransport, addr: Tuple[str, int], server: WulframServerContext, session: Optional[ClientSession] = None):
@@ -306,30 +318,46 @@ class UdpContext:
             payload = payload
 
         self.transport.send(payload, self.addr)
-        self.server.logger.log_packet("UDP-SEND", 
-                                      payload, addr=self.addr, 
-                                      show_ascii=self.server.cfg.debug.show_ascii, 
-                                      include_tcp_len_prefix=False)
+        logger = self.server.logger
+        if logger.enabled:
+            logger.log_packet("UDP-SEND", 
+                              payload, addr=self.addr, 
+                              show_ascii=self.server.cfg.debug.show_ascii, 
+                              include_tcp_len_prefix=False)
+
+    def send_packet(self, opcode: int, body: bytes):
+        """
+        Sends [Opcode][Body] without joining them first (for large per-tick bodies).
+        The joined payload is only built if the logger is going to print it.
+        """
+        self.transport.send_packet(opcode, body, self.addr)
+        logger = self.server.logger
+        if logger.is_logged(opcode):
+            logger.log_packet("UDP-SEND", 
+                              bytes((opcode,)) + body, addr=self.addr, 
+                              show_ascii=self.server.cfg.debug.show_ascii, 
+                              include_tcp_len_prefix=False)
 
     def send_ack(self, packet_id: int, seq_num: int, subcmd: int = 1):
         """Sends a standard UDP ACK (0x02)"""
         print("send_ack")
-        pkt = PacketWriter()
         
         # Wulfram ACK Payload Structure, using the one from handle_ack2 logic:
         # [0x02] [SubCmd] [AckedPacketID] [SeqNum]
         # Note: The old handler logic for send_standard_ack used:
         # [Seq(2)] [Len(2)] [SubCmd(1)] [PacketID(1)] [AckedSeq(2)]?
         
-        # Matches Wulfram Reliable ACK structure
+        # Matches Wulfram Reliable ACK structure (fixed layout: one pack call)
         self.outgoing_seq += 1
-        pkt.write_int16(self.outgoing_seq) # Our Seq
-        pkt.write_int16(9)                 # Len
-        pkt.write_byte(subcmd)             # SubCmd
-        pkt.write_byte(packet_id)          # Acking Packet ID
-        pkt.write_int16(seq_num)           # Acking Seq Num
+        body = _ACK_STRUCT.pack(
+            self.outgoing_seq & 0xFFFF, # Our Seq
+            9,                          # Len
+            subcmd & 0xFF,              # SubCmd
+            packet_id & 0xFF,           # Acking Packet ID
+            seq_num & 0xFFFF,           # Acking Seq Num
+        )
         
-        self.send(b'\x02' + pkt.get_bytes())
+        self.send(b'\x02' + body)
 
 # -------------------------------------------------------------------------
 # DISPATCHER & HANDLERS
@@ -366,12 +394,23 @@ def global_game_loop(server: WulframServerContext):
                     my_ent.actions[4] = 0.0 # Reset trigger
 
         # --- 2. Gather Dirty State ---
-        # We get the list ONCE. The state remains valid for all clients.
-        dirty_entities = server.entities.get_dirty_entities()
+        # We snapshot the masks ONCE and clear exactly those bits, so every
+        # client gets the same state and anything marked dirty mid-broadcast
+        # (the UDP thread keeps running) stays pending for the next tick.
+        dirty = server.entities.take_dirty_snapshot()
+        dirty_entities = [entity for entity, _ in dirty.values()]
         current_tick = get_ticks()
 
         # --- 3. Broadcast Loop ---
         if dirty_entities:
+            # Per-tick lookups hoisted out of the per-session loop
+            build_update_packet = server.entities.build_update_packet
+            dirty_masks = {net_id: mask for net_id, (_, mask) in dirty.items()}
+            # Each dirty entity is packed once and the record shared by every
+            # client: a per-tick snapshot. A move made mid-loop re-marks the
+            # entity dirty, so it goes out next tick.
+            record_cache = {}
+
             for session in server.sessions:
                 # CHECK: Must be logged in AND ready for updates
                 if not session.is_logged_in or not session.is_ready_for_updates:
@@ -394,35 +433,38 @@ def global_game_loop(server: WulframServerContext):
                 if others:
                     # Build payload (No Timestamp, No Local Stats)
                     # We MUST pass local_stats here, even though it's an update for "others"
-                    payload = server.entities.build_update_packet(
+                    payload = build_update_packet(
                         others, 
                         sequence_num=current_tick, 
                         is_view_update=False,
-                        local_stats=my_stats
+                        local_stats=my_stats,
+                        record_cache=record_cache,
+                        masks=dirty_masks
                     )
                     if payload:
-                        # Prepend OpCode 0x0E
-                        session.udp_context.send(b'\x0E' + payload)
+                        # OpCode 0x0E + payload
+                        session.udp_context.send_packet(0x0E, payload)
 
                 # --- B. PACKET FOR "SELF" (0x0F - View Update) ---
                 # Check if "I" am dirty. If so, send View Update.
-                if my_entity in dirty_entities:
+                if my_entity.net_id in dirty_masks:
                     # Build payload (Includes Timestamp, Includes Local Stats)
                     stats = (my_entity.health, my_entity.energy)
                     
-                    payload = server.entities.build_update_packet(
+                    payload = build_update_packet(
                         [my_entity], 
                         sequence_num=current_tick, 
                         is_view_update=True, 
-                        local_stats=stats
+                        local_stats=stats,
+                        record_cache=record_cache,
+                        masks=dirty_masks
                     )
                     if payload:
-                        # Prepend OpCode 0x0F
-                        session.udp_context.send(b'\x0F' + payload)
+                        # OpCode 0x0F + payload
+                        session.udp_context.send_packet(0x0F, payload)
 
         # --- 4. Cleanup ---
-        # Now that everyone has been told about the updates, we can clear the flags.
-        server.entities.clear_all_dirty_flags()
+        # Nothing to do: take_dirty_snapshot already cleared the bits we sent.
 
         # --- 5. Sleep to maintain tick rate ---
         elapsed = time.time() - start_time
@@ -638,11 +680,14 @@ def on_login_request(ctx: TcpContext, payload: bytes):
     # Signal the main thread that we have the data
     ctx.session.login_received.set()
 
+# BPS Request (0x4E): [Op:8] [RequestedRate:32]
+_BPS_REQ_STRUCT = struct.Struct(">I")
+
 @dispatcher.route(0x4E)
 def on_bps_request(ctx: TcpContext, payload: bytes):
     log_packet("TCP-RECV", payload)
     if len(payload) >= 5:
-        (requested_rate,) = struct.unpack(">I", payload[1:5])
+        (requested_rate,) = _BPS_REQ_STRUCT.unpack_from(payload, 1)
         ctx.send(BpsReplyPacket(requested_rate))
     else:
         print("[WARN] Malformed BPS Request")
@@ -681,10 +726,15 @@ def on_kudos(ctx: TcpContext, payload: bytes):
 
 # --- UDP Routes ---
 
+def _decode_cstr(raw: bytes) -> str:
+    """Decodes a C string: everything up to the first null (or the end), as ASCII."""
+    end = raw.find(0)
+    return (raw if end < 0 else raw[:end]).decode('ascii', errors='ignore')
+
 @dispatcher.route(0x00)
 def on_debug_string(ctx: UdpContext, payload: bytes):
     try:
-        msg = payload[2:].decode('ascii', errors='ignore').strip('\x00')
+        msg = _decode_cstr(bytes(payload[2:]))
         print(f"    > UDP DEBUG MSG: '{msg}'")
     except: pass
 
@@ -693,36 +743,13 @@ def on_ack(ctx: UdpContext, payload: bytes):
     # Just log it
     pass
 
-@dispatcher.route(0x03)
-def on_d_handshake(ctx: UdpContext, payload: bytes):
+def _build_d_handshake_streams() -> bytes:
     """
-    Handles the UDP Handshake.
-    Payload: [0x03] [Time] [ConnID] [StreamCount] ...
+    The stream definitions + configuration sent after the D_HANDSHAKE header.
+    Fully static, so it is built once.
+    (Simplified for brevity, full impl in original udp_handler)
     """
-    log_packet("RECV-UDP", payload)
-
-    if not ctx.session:
-        print("[WARN] Ignored packet from unknown UDP source")
-        return
-
-    reader = PacketReader(payload)
-    reader.read_byte() # Op
-    timestamp = reader.read_int32()
-    conn_id = reader.read_int32()
-    stream_count = reader.read_int32()
-    print(f"    > D_HANDSHAKE: Time={timestamp}, ID={conn_id}, Streams={stream_count}")
-    
-    # 1. Send Handshake ACK (SubCmd 0)
-    pkt = PacketWriter()
-    pkt.write_byte(0) # SubCmd
-    pkt.write_int32(get_ticks())
-    ctx.send(b'\x02' + pkt.get_bytes())
-
-    # 2. Send Our Handshake Definitions
-    # (Simplified for brevity, full impl in original udp_handler)
     pkt_hs = PacketWriter()
-    pkt_hs.write_int32(get_ticks()) # Server timestamp
-    pkt_hs.write_int32(ctx.session.player_id) # Player ID?
     # --- STREAM DEFINITIONS ---
     # We define 4 streams to match the client's expectations
     pkt_hs.write_int32(4) # Def Count
@@ -757,23 +784,62 @@ def on_d_handshake(ctx: UdpContext, payload: bytes):
     pkt_hs.write_int32(2); pkt_hs.write_int32(1)
     pkt_hs.write_int32(3); pkt_hs.write_int32(1)
 
-    ctx.send(b'\x03' + pkt_hs.get_bytes())
+    return pkt_hs.get_bytes()
+
+# D_HANDSHAKE: [Server timestamp] [Player ID?], then the static stream setup
+_D_HANDSHAKE_HDR = struct.Struct(">II")
+# Handshake ACK (0x02): [SubCmd 0] [Server timestamp]
+_D_ACK_STRUCT = struct.Struct(">BI")
+_D_HANDSHAKE_STREAMS = _build_d_handshake_streams()
+
+# D_SET_START (0x04): [Stream Id] [Sequence]
+_D_SET_START_STRUCT = struct.Struct(">BH")
+
+def _build_d_set_start_packet(stream_id: int, sequence: int) -> bytes:
+    return b'\x04' + _D_SET_START_STRUCT.pack(stream_id & 0xFF, sequence & 0xFFFF)
+
+# The handshake only ever starts these, so they are prebuilt constants
+_D_SET_START_PACKETS = {key: _build_d_set_start_packet(*key) for key in ((1, 1), (3, 1))}
+
+def _d_set_start_packet(stream_id: int, sequence: int) -> bytes:
+    pkt = _D_SET_START_PACKETS.get((stream_id, sequence))
+    return pkt if pkt is not None else _build_d_set_start_packet(stream_id, sequence)
+
+@dispatcher.route(0x03)
+def on_d_handshake(ctx: UdpContext, payload: bytes):
+    """
+    Handles the UDP Handshake.
+    Payload: [0x03] [Time] [ConnID] [StreamCount] ...
+    """
+    log_packet("RECV-UDP", payload)
+
+    if not ctx.session:
+        print("[WARN] Ignored packet from unknown UDP source")
+        return
+
+    reader = PacketReader(payload)
+    reader.read_byte() # Op
+    timestamp = reader.read_int32()
+    conn_id = reader.read_int32()
+    stream_count = reader.read_int32()
+    print(f"    > D_HANDSHAKE: Time={timestamp}, ID={conn_id}, Streams={stream_count}")
+    
+    # 1. Send Handshake ACK (SubCmd 0)
+    ctx.send(b'\x02' + _D_ACK_STRUCT.pack(0, get_ticks()))
+
+    # 2. Send Our Handshake Definitions
+    # Only the timestamp and player ID change; the stream setup is prebuilt.
+    ctx.send(b'\x03' + _D_HANDSHAKE_HDR.pack(get_ticks(), ctx.session.player_id & 0xFFFFFFFF) + _D_HANDSHAKE_STREAMS)
     # end handshake
 
     print("[UDP] Synchronizing Streams...")
     # 3. Unpause Streams (Critical for client to accept data)
     
     # Stream 1
-    p1 = PacketWriter()
-    p1.write_byte(1) # Stream Id
-    p1.write_int16(1) # Sequence
-    ctx.send(b'\x04' + p1.get_bytes())
+    ctx.send(_d_set_start_packet(1, 1))
 
     # Stream 3
-    p3 = PacketWriter()
-    p3.write_byte(3) # Stream Id
-    p3.write_int16(1) # Sequence
-    ctx.send(b'\x04' + p3.get_bytes())
+    ctx.send(_d_set_start_packet(3, 1))
 
 @dispatcher.route(0x08)
 def on_root_hello(ctx: UdpContext, payload: bytes):
@@ -782,6 +848,9 @@ def on_root_hello(ctx: UdpContext, payload: bytes):
     # It contains no ID, so we cannot link it to a session yet.
     ctx.server.logger.log_packet("UDP-RECV (ROOT-HELLO)", payload=payload, show_ascii=True)
 
+# Pong (0x0C): [Echoed client timestamp]
+_PONG_STRUCT = struct.Struct(">I")
+
 @dispatcher.route(0x0B)
 def on_client_ping_request(ctx: UdpContext, payload: bytes):
     """
@@ -797,9 +866,8 @@ def on_client_ping_request(ctx: UdpContext, payload: bytes):
     client_ts = reader.read_int32()
     
     # 2. Reply with 0x0C (Pong), echoing that timestamp exactly
-    w = PacketWriter()
-    w.write_int32(client_ts) # Doesn't seem to change the ping in the client no matter what this is set to?
-    ctx.send(b'\x0C' + w.get_bytes())
+    # Doesn't seem to change the ping in the client no matter what this is set to?
+    ctx.send(b'\x0C' + _PONG_STRUCT.pack(client_ts & 0xFFFFFFFF))
     #print(f"    > Replying to Client Ping (Time: {client_ts})")
 
 @dispatcher.route(0x0C)
@@ -824,6 +892,9 @@ def on_udp_ping(ctx: UdpContext, payload: bytes):
         #w.write_int32(client_ts)
         #ctx.send(b'\x0C' + w.get_bytes())
 
+# ACK2 body after the opcode: [Seq:2] [Len:2] [Status:4]
+_ACK2_STRUCT = struct.Struct(">HHi")
+
 @dispatcher.route(0x33)
 def on_ack2(ctx: UdpContext, payload: bytes):
     """ Packet 0x33: ACK2 (Response to Process Translation)
@@ -835,12 +906,17 @@ def on_ack2(ctx: UdpContext, payload: bytes):
     print("on_ack2")
     if len(payload) < 5: return
     # Payload: [33] [Seq:2] [Len:2] [Status:4]
-    reader = PacketReader(payload)
-    reader.read_byte() # Op (33)
-    seq = reader.read_int16() # Sequence Num
-    length = reader.read_int16() # Packet Len
+    if len(payload) >= 1 + _ACK2_STRUCT.size:
+        # Sequence Num, Packet Len, Status (seems to always be 1)
+        seq, length, status = _ACK2_STRUCT.unpack_from(payload, 1)
+    else:
+        # Truncated: the reader hands back 0 for missing fields
+        reader = PacketReader(payload)
+        reader.read_byte() # Op (33)
+        seq = reader.read_int16() # Sequence Num
+        length = reader.read_int16() # Packet Len
 
-    status = reader.read_int32() # Seems to always be 1
+        status = reader.read_int32() # Seems to always be 1
 
     print(f"    > RECV ACK2 (Seq {seq} | Len {length}) - Status: {status}")
     
@@ -950,6 +1026,9 @@ def on_reincarnate(ctx: UdpContext, payload: bytes):
     # Sends message code about team switched successfully
     ctx.send(ReincarnatePacket(code=17))
 
+# COMM_REQ fixed prefix after the opcode: [Seq:2] [Len:2] [Scope:2] [Unk:2]
+_COMM_REQ_STRUCT = struct.Struct(">HHHH")
+
 @dispatcher.route(0x20)
 def on_chat_comm_req(ctx: UdpContext, payload: bytes):
     """
@@ -960,14 +1039,10 @@ def on_chat_comm_req(ctx: UdpContext, payload: bytes):
         print("[WARN] Ignored packet from unknown UDP source")
         return
 
-    reader = PacketReader(payload)
-    reader.read_byte() # Op (20)
-    sequence_num = reader.read_int16()
-    payload_len = reader.read_int16()
-
-    source_scope = reader.read_int16()
-    unk_id = reader.read_int16()
-    inc_message = reader.read_string()
+    # [Op (20)] [Seq] [Len] [Scope] [Unk], then the message string
+    # (the length check above guarantees the fixed prefix is there)
+    sequence_num, payload_len, source_scope, unk_id = _COMM_REQ_STRUCT.unpack_from(payload, 1)
+    inc_message = PacketReader(payload[1 + _COMM_REQ_STRUCT.size:]).read_string()
 
     print(f"CHAT: id: {unk_id} | source: {source_scope} | message: {inc_message}")
     
@@ -1069,11 +1144,11 @@ def parse_action_packet(ctx: UdpContext, payload: bytes, is_dump: bool):
         # Upward Thrust (Hover) - SPECIAL CASE
         # Analog Action ID 5 (always uses Config index 10)
         elif action_id == 5:
-            value = reader.read_quantized_float(cfg_analog_5)
+            value = cfg_analog_5.read(reader)
             
         # Analog Action 0-3, 6-7 (Config 11)
         else:
-            value = reader.read_quantized_float(cfg_analog_std)
+            value = cfg_analog_std.read(reader)
 
         # --- UPDATE THE ENTITY ---
         if ctx.session and ctx.session.entity:
@@ -1365,8 +1440,8 @@ def broadcast(server: WulframServerContext, packet_data: bytes | Packet, exclude
     else:
         payload = packet_data
     
-    # We need to frame it for TCP if we fall back, so calculate header once
-    tcp_header = struct.pack(">H", len(payload) + 2)
+    # We need to frame it for TCP if we fall back, so frame it once
+    tcp_frame = TcpEnvelope.encode(payload)
 
     for session in server.sessions:
         # Skip not logged in or excluded sessions
@@ -1378,7 +1453,7 @@ def broadcast(server: WulframServerContext, packet_data: bytes | Packet, exclude
             if session.udp_context:
                 session.udp_context.send(payload)
             elif session.tcp_sock:
-                session.tcp_sock.sendall(tcp_header + payload)
+                session.tcp_sock.sendall(tcp_frame)
         except Exception as e:
             print(f"[Broadcast] Error sending to {session.name}: {e}")
 
@@ -1414,8 +1489,7 @@ def broadcast_chat(server: WulframServerContext, message: str, source_player_id:
                 # We need to manually frame it for TCP if we don't use the wrapper
                 # ideally we'd reconstruct a TcpContext, but raw send is easier here:
                 # length + payload
-                header = struct.pack(">H", len(encoded) + 2)
-                session.tcp_sock.sendall(header + encoded)
+                session.tcp_sock.sendall(TcpEnvelope.encode(encoded))
                 count += 1
         except Exception as e:
             print(f"[Broadcast] Failed to send to {session.name}: {e}")
@@ -4,8 +4,10 @@ from typing import Callable, Any
 
 class PacketDispatcher:
     def __init__(self, on_unknown: Callable[[Any, bytes], None] | None = None):
-        # Maps Opcode (int) -> Handler Function
-        self._handlers: dict[int, Callable] = {}
+        # Opcode (int) -> Handler Function
+        # Opcodes are a single byte, so a flat 256-slot table indexed by opcode
+        # replaces a dict lookup. None means unhandled.
+        self._handlers: list[Callable | None] = [None] * 256
         self.on_unknown = on_unknown
 
     def route(self, opcode: int):
@@ -13,8 +15,11 @@ class PacketDispatcher:
         Decorator to register a handler for a specific opcode.
         Usage: @dispatcher.route(0x13)
         """
+        if not 0 <= opcode <= 0xFF:
+            raise ValueError(f"Opcode must fit in one byte, got {opcode!r}")
+
         def decorator(func):
-            if opcode in self._handlers:
+            if self._handlers[opcode] is not None:
                 print(f"[WARN] Overwriting handler for opcode 0x{opcode:02X}")
             self._handlers[opcode] = func
             return func
@@ -25,7 +30,7 @@ class PacketDispatcher:
             return
 
         opcode = payload[0]
-        handler = self._handlers.get(opcode)
+        handler = self._handlers[opcode]
 
         if handler:
             # Call the handler found via the decorator
@@ -6,6 +6,12 @@ from network.packets.base import Packet
 from network.streams import PacketWriter
 from .packet_config import BehaviorConfig
 
+# Built payloads, keyed by repr(cfg). The payload is a pure function of the
+# config's field values, and every client gets the same one on join.
+# Keying on the values (not id()) means an edited config simply misses.
+_PAYLOAD_CACHE: dict[str, bytes] = {}
+_PAYLOAD_CACHE_SIZE = 16
+
 @dataclass
 class BehaviorPacket(Packet):
     """
@@ -14,7 +20,17 @@ class BehaviorPacket(Packet):
     cfg: BehaviorConfig = field(repr=False)
 
     def serialize(self) -> bytes:
+        key = repr(self.cfg)
+        payload = _PAYLOAD_CACHE.get(key)
+        if payload is None:
+            if len(_PAYLOAD_CACHE) >= _PAYLOAD_CACHE_SIZE:
+                _PAYLOAD_CACHE.clear()
+            payload = _PAYLOAD_CACHE[key] = self._build()
+        return payload
+
+    def _build(self) -> bytes:
         pkt = PacketWriter()
+        pkt.begin_packet(0x24)
         cfg = self.cfg
 
         # --------------------------
@@ -50,67 +66,46 @@ class BehaviorPacket(Packet):
         # --------------------------
         # SECTION 2: WEAPONS (unchanged, hard-coded)
         # --------------------------
-        for _u in range(cfg.weapons_units_count):
-            for _i in range(cfg.weapon_slots_count):
-                # 5 bool bytes
-                pkt.write_byte(0)
-                pkt.write_byte(0)
-                pkt.write_byte(0)
-                pkt.write_byte(0)
-                pkt.write_byte(0)
-
-                # targeting cone
-                pkt.write_fixed1616(1.0)
-
-                # 5 ints
-                pkt.write_int32(0)
-                pkt.write_int32(0)
-                pkt.write_int32(0)
-                pkt.write_int32(0)
-                pkt.write_int32(0)
-
-                # 4 fixeds
-                pkt.write_fixed1616(100.0)
-                pkt.write_fixed1616(1000.0)
-                pkt.write_fixed1616(500.0)
-                pkt.write_fixed1616(1.0)
+        # Sections 2-5 repeat one identical record N times, so each record
+        # is encoded once and the bytes are repeated.
+        pkt.write_bytes(_WEAPON_SLOT_BLOCK * (cfg.weapons_units_count * cfg.weapon_slots_count))
 
         # --------------------------
         # SECTION 3: UNITS (configurable defaults)
         # --------------------------
         ud = cfg.unit_defaults
-        for _ in range(cfg.unit_count):
-            pkt.write_fixed1616(ud.scale)
-            pkt.write_fixed1616(ud.regen_or_health_related)
-            pkt.write_int32(ud.max_health)
+        unit = PacketWriter()
+        unit.write_fixed1616(ud.scale)
+        unit.write_fixed1616(ud.regen_or_health_related)
+        unit.write_int32(ud.max_health)
+        pkt.write_bytes(unit.get_bytes() * cfg.unit_count)
 
         # --------------------------
         # SECTION 4: VEHICLE PHYSICS (configurable)
         # --------------------------
         vp = cfg.vehicle_physics
-        for _ in range(cfg.vehicle_physics_count):
-            pkt.write_fixed1616(vp.speed)
-            pkt.write_fixed1616(vp.accel)
+        vehicle = PacketWriter()
+        vehicle.write_fixed1616(vp.speed)
+        vehicle.write_fixed1616(vp.accel)
 
-            pkt.write_int32(vp.engine_torque)
-            pkt.write_int32(vp.suspension_stiffness)
+        vehicle.write_int32(vp.engine_torque)
+        vehicle.write_int32(vp.suspension_stiffness)
 
-            pkt.write_fixed1616(vp.ground_friction)
-            pkt.write_fixed1616(vp.turn_rate)
-            pkt.write_fixed1616(vp.suspension_dampening)
+        vehicle.write_fixed1616(vp.ground_friction)
+        vehicle.write_fixed1616(vp.turn_rate)
+        vehicle.write_fixed1616(vp.suspension_dampening)
 
-            pkt.write_int32(vp.unknown_int_30)
-            pkt.write_int32(vp.mass)
+        vehicle.write_int32(vp.unknown_int_30)
+        vehicle.write_int32(vp.mass)
+        pkt.write_bytes(vehicle.get_bytes() * cfg.vehicle_physics_count)
 
         # --------------------------
         # SECTION 5: HARDPOINTS (unchanged for now)
         # --------------------------
         # May or may not have got the teams correctly labeled for these
         # Also, thinking is_thruster might be something else entirely
-        _write_hardpoint_block(pkt, count=2, is_thruster=True)  # Red Tank
-        _write_hardpoint_block(pkt, count=2, is_thruster=True)  # Blue Tank
-        _write_hardpoint_block(pkt, count=2, is_thruster=True)  # Red Scout
-        _write_hardpoint_block(pkt, count=2, is_thruster=True)  # Blue Scout
+        # Red Tank, Blue Tank, Red Scout, Blue Scout
+        pkt.write_bytes(_THRUSTER_HARDPOINT_BLOCK * 4)
 
         # --------------------------
         # SECTION 6: ACTIVE VEHICLE PHYSICS (Configurable)
@@ -133,7 +128,6 @@ class BehaviorPacket(Packet):
                 pkt.write_fixed1616(av.low_fuel_level)
                 pkt.write_fixed1616(av.max_altitude)
                 pkt.write_fixed1616(av.gravity_pct)
-                pass
                 
             elif i == 1:
                 # SCOUT (Reads 9 values)
@@ -165,8 +159,7 @@ class BehaviorPacket(Packet):
         # --------------------------
         # FINAL: PAYLOAD
         # --------------------------
-        body = pkt.get_bytes()
-        payload = b"\x24" + body
+        payload = pkt.get_bytes()
 
         return payload
 
@@ -248,3 +241,44 @@ def _write_hardpoint_block(pkt: PacketWriter, count: int, is_thruster: bool) ->
     else:
         # For weapons, this might be range or cooldown, 0.0 might be fine for now
         pkt.write_fixed1616(0.0)
+
+
+def _build_weapon_slot_block() -> bytes:
+    """One weapon slot record. Every slot of every unit gets these same bytes."""
+    pkt = PacketWriter()
+
+    # 5 bool bytes
+    pkt.write_byte(0)
+    pkt.write_byte(0)
+    pkt.write_byte(0)
+    pkt.write_byte(0)
+    pkt.write_byte(0)
+
+    # targeting cone
+    pkt.write_fixed1616(1.0)
+
+    # 5 ints
+    pkt.write_int32(0)
+    pkt.write_int32(0)
+    pkt.write_int32(0)
+    pkt.write_int32(0)
+    pkt.write_int32(0)
+
+    # 4 fixeds
+    pkt.write_fixed1616(100.0)
+    pkt.write_fixed1616(1000.0)
+    pkt.write_fixed1616(500.0)
+    pkt.write_fixed1616(1.0)
+
+    return pkt.get_bytes()
+
+
+def _build_hardpoint_block(count: int, is_thruster: bool) -> bytes:
+    pkt = PacketWriter()
+    _write_hardpoint_block(pkt, count=count, is_thruster=is_thruster)
+    return pkt.get_bytes()
+
+
+# Hard-coded blocks, encoded once at import
+_WEAPON_SLOT_BLOCK = _build_weapon_slot_block()
+_THRUSTER_HARDPOINT_BLOCK = _build_hardpoint_block(count=2, is_thruster=True)
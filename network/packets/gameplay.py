@@ -12,11 +12,12 @@ class DeleteObjectPacket(Packet):
 
     def serialize(self) -> bytes:
         pkt = PacketWriter()
+        pkt.begin_packet(0x15)
         pkt.write_int32(get_ticks())
         pkt.write_byte(1) # 1 Object
         pkt.write_int32(self.net_id)
         pkt.write_byte(1) # True
-        return b'\x15' + pkt.get_bytes()
+        return pkt.get_bytes()
 
 @dataclass
 class DockingPacket(Packet):
@@ -25,10 +26,11 @@ class DockingPacket(Packet):
 
     def serialize(self) -> bytes:
         pkt = PacketWriter()
+        pkt.begin_packet(0x38)
         pkt.write_int32(get_ticks())
         pkt.write_int32(self.entity_id)
         pkt.write_byte(1 if self.is_docked else 0)
-        return b'\x38' + pkt.get_bytes()
+        return pkt.get_bytes()
 
 @dataclass
 class CarryingInfoPacket(Packet):
@@ -39,11 +41,12 @@ class CarryingInfoPacket(Packet):
 
     def serialize(self) -> bytes:
         pkt = PacketWriter()
+        pkt.begin_packet(0x29)
         pkt.write_int32(self.player_id)
         pkt.write_byte(1 if self.has_cargo else 0)
         pkt.write_byte(self.unk_v2)
         pkt.write_byte(self.item_id)
-        return b'\x29' + pkt.get_bytes()
+        return pkt.get_bytes()
     
 @dataclass
 class ResetGamePacket(Packet):
@@ -29,6 +29,7 @@ class HelloPacket(Packet):
     def serialize(self) -> bytes:
         print(f"[SERIALIZE] HELLO 0x13: Sub-Cmd -> {self.sub_cmd}")
         pkt = PacketWriter()
+        pkt.begin_packet(0x13)
         
         # 1. Write the Sub-Command (Common to all)
         pkt.write_byte(self.sub_cmd)
@@ -52,7 +53,7 @@ class HelloPacket(Packet):
             # No payload, just the sub-command
             pass
 
-        return b'\x13' + pkt.get_bytes()
+        return pkt.get_bytes()
 
     # --- Factory Methods ---
 
@@ -1,10 +1,14 @@
 # network/packet_logger.py
 from __future__ import annotations
-import struct
 from typing import Optional, Tuple
 
+from network.streams import PACK_U16
+
 class PacketLogger:
-    def __init__(self):
+    def __init__(self, enabled: bool = True):
+        # Master switch: when off, every log call returns before any formatting
+        self.enabled = enabled
+
         # Map IDs to Readable Names
         self.packet_names = {
             0x02: "D_ACK",
@@ -25,6 +29,13 @@ class PacketLogger:
             0x4E: "BPS_REQUEST",
         }
 
+        # Spammy packets that are never logged
+        self.ignored_types = {0x09, 0x0B, 0x0C, 0x0E, 0x0F, 0x40, 0x49}
+
+    def is_logged(self, pkt_type: int) -> bool:
+        """Cheap pre-check so callers can skip building a payload that would be ignored."""
+        return self.enabled and pkt_type not in self.ignored_types
+
     # ---------------------------
     # New API (matches my log_packet)
     # ---------------------------
@@ -47,14 +58,14 @@ class PacketLogger:
             If True, prints the 2-byte big-endian length prefix (len(payload)+2)
             as part of the hex dump (handy for TCP debugging).
         """
-        if not payload:
+        if not self.enabled or not payload:
             return
 
         pkt_type = payload[0]
         name = self.packet_names.get(pkt_type, "UNKNOWN")
 
         # Ignore spammy packets
-        if pkt_type in [0x09, 0x0B, 0x0C, 0x0E, 0x0F, 0x40, 0x49]:
+        if pkt_type in self.ignored_types:
             return
 
         # Displayed length: match your old style (just the bytes you pass in)
@@ -69,7 +80,7 @@ class PacketLogger:
         # Hex dump: optionally include the TCP 2-byte length prefix
         if include_tcp_len_prefix:
             tcp_len = len(payload) + 2
-            header = struct.pack(">H", tcp_len)
+            header = PACK_U16.pack(tcp_len)
             hex_str = (header + payload).hex().upper()
         else:
             hex_str = payload.hex().upper()
@@ -101,6 +112,9 @@ class PacketLogger:
           - full payload that already includes opcode
         We normalize to log_packet().
         """
+        if not self.enabled:
+            return
+
         if not payload:
             # If caller passed body-only and it's empty, still log header line if you want.
             self.log_packet(direction, bytes([pkt_type]), addr=addr, show_ascii=show_ascii)
@@ -118,6 +132,10 @@ class PacketLogger:
 # Optional convenience function if you want the exact name "log_packet" as a free function.
 _default_logger = PacketLogger()
 
+def get_default_logger() -> PacketLogger:
+    """The logger behind the free log_packet() function (e.g. to toggle .enabled)."""
+    return _default_logger
+
 def log_packet(direction: str, payload: bytes, show_ascii: bool = True) -> None:
     """
     Free-function wrapper (drop-in for my earlier example).
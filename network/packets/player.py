@@ -14,9 +14,10 @@ class ReincarnatePacket(Packet):
 
     def serialize(self) -> bytes:
         pkt = PacketWriter()
+        pkt.begin_packet(0x25)
         pkt.write_byte(self.code)
         pkt.write_string(self.message)
-        return b'\x25' + pkt.get_bytes()
+        return pkt.get_bytes()
 
 @dataclass
 class BirthNoticePacket(Packet):
@@ -27,9 +28,10 @@ class BirthNoticePacket(Packet):
 
     def serialize(self) -> bytes:
         pkt = PacketWriter()
+        pkt.begin_packet(0x1E)
         pkt.write_int32(self.player_id)
         pkt.write_int32(1) # Unknown
-        return b'\x1E' + pkt.get_bytes()
+        return pkt.get_bytes()
 
 @dataclass
 class DeathNoticePacket(Packet):
@@ -40,8 +42,9 @@ class DeathNoticePacket(Packet):
 
     def serialize(self) -> bytes:
         pkt = PacketWriter()
+        pkt.begin_packet(0x1D)
         pkt.write_int32(self.player_id)
-        return b'\x1D' + pkt.get_bytes()
+        return pkt.get_bytes()
 
 @dataclass
 class RemoveFromRosterPacket(Packet):
@@ -52,8 +55,9 @@ class RemoveFromRosterPacket(Packet):
 
     def serialize(self) -> bytes:
         pkt = PacketWriter()
+        pkt.begin_packet(0x1B)
         pkt.write_int32(self.account_id)
-        return b'\x1B' + pkt.get_bytes()
+        return pkt.get_bytes()
 
 @dataclass
 class AddToRosterPacket(Packet):
@@ -67,6 +71,7 @@ class AddToRosterPacket(Packet):
 
     def serialize(self) -> bytes:
         pkt = PacketWriter()
+        pkt.begin_packet(0x1A)
         pkt.write_int32(self.account_id)
         pkt.write_int32(0)   # unknown
         pkt.write_int16(self.team)    # team
@@ -78,7 +83,7 @@ class AddToRosterPacket(Packet):
         pkt.write_fixed1616(6.9)      # Score
         pkt.write_int32(2)            # ?
 
-        return b'\x1A' + pkt.get_bytes()
+        return pkt.get_bytes()
 
 @dataclass
 class CommMessagePacket(Packet):
@@ -93,13 +98,14 @@ class CommMessagePacket(Packet):
 
     def serialize(self) -> bytes:
         pkt = PacketWriter()
+        pkt.begin_packet(0x1F)
         pkt.write_int16(self.message_type) # Message Class/Type
         pkt.write_int32(self.source_player_id) # Source Player ID
         pkt.write_int16(self.chat_scope_id) # Chat Channel/Scope (0 = Global, 4 = Team, 5 = Command/Console)
         pkt.write_int32(self.recepient_id) # Recipient ID (only used for whispers i believe)
         pkt.write_string(self.message)
         
-        return b'\x1F' + pkt.get_bytes()
+        return pkt.get_bytes()
 
 @dataclass
 class UpdateStatsPacket(Packet):
@@ -122,6 +128,7 @@ class UpdateStatsPacket(Packet):
 
     def serialize(self) -> bytes:
         pkt = PacketWriter()
+        pkt.begin_packet(0x1C)
         
         pkt.write_int32(self.player_id)
         pkt.write_int32(6)              # Unknown Int 1
@@ -138,4 +145,4 @@ class UpdateStatsPacket(Packet):
         pkt.write_fixed1616(1.0)
         
         pkt.write_int32(10)           # Extra / Flags
-        return b'\x1C' + pkt.get_bytes()
\ No newline at end of file
+        return pkt.get_bytes()
\ No newline at end of file
@@ -27,6 +27,7 @@ class TankPacket(Packet):
 
         # 2. Build the Payload
         pkt = PacketWriter()
+        pkt.begin_packet(0x18)
         pkt.write_int32(self.sequence_id if self.sequence_id is not None else get_ticks())
 
         stats = self.tank_cfg.stats
@@ -51,4 +52,4 @@ class TankPacket(Packet):
         pkt.write_vector3(_rot[0], _rot[1], _rot[2])
 
         # 3. Return with Opcode (0x18)
-        return b"\x18" + pkt.get_bytes()
\ No newline at end of file
+        return pkt.get_bytes()
\ No newline at end of file
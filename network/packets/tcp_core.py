@@ -22,9 +22,10 @@ class PlayerInfoPacket(Packet):
     
     def serialize(self) -> bytes:
         pkt = PacketWriter()
+        pkt.begin_packet(0x17)
         pkt.write_int32(self.player_id)
         pkt.write_byte(1 if self.player_guest_flag else 0)
-        return b'\x17' + pkt.get_bytes()
+        return pkt.get_bytes()
 
 @dataclass
 class LoginStatusPacket(Packet):
@@ -37,10 +38,11 @@ class LoginStatusPacket(Packet):
 
     def serialize(self) -> bytes:
         pkt = PacketWriter()
+        pkt.begin_packet(0x22)
         # Convert bool to 1 or 0
         pkt.write_byte(1 if self.is_donor else 0)
         pkt.write_byte(self.code)
-        return b'\x22' + pkt.get_bytes()
+        return pkt.get_bytes()
 
 @dataclass
 class IdentifiedUdpPacket(Packet):
@@ -58,8 +60,9 @@ class MotdPacket(Packet):
 
     def serialize(self) -> bytes:
         pkt = PacketWriter()
+        pkt.begin_packet(0x23)
         pkt.write_string(self.message)
-        return b'\x23' + pkt.get_bytes()
+        return pkt.get_bytes()
     
 @dataclass
 class BpsReplyPacket(Packet):
@@ -75,19 +78,21 @@ class BpsReplyPacket(Packet):
     
     def serialize(self) -> bytes:
         pkt = PacketWriter()
+        pkt.begin_packet(0x4E)
         pkt.write_int32(self.requested_rate)
         pkt.write_byte(1)
-        return b'\x4E' + pkt.get_bytes()
+        return pkt.get_bytes()
     
 @dataclass
 class GameClockPacket(Packet):
     def serialize(self) -> bytes:
         pkt = PacketWriter()
+        pkt.begin_packet(0x2F)
         pkt.write_int32(get_ticks())
         pkt.write_byte(0x01) # Is active or enabled? not sure
         pkt.write_int32(1) # Maybe Phase flag (0 = Push, 1 = Glimpse), 0 or 1
         pkt.write_int32(30000) # Length of next Push/Glimpse (in Ms)
-        return b'\x2F' + pkt.get_bytes()
+        return pkt.get_bytes()
     
 @dataclass
 class WorldStatsPacket(Packet):
@@ -105,11 +110,12 @@ class WorldStatsPacket(Packet):
     
     def serialize(self) -> bytes:
         pkt = PacketWriter()
+        pkt.begin_packet(0x16)
         pkt.write_string(self.map_name) # Map Name
         pkt.write_byte(1)             # Unused Flag?
         pkt.write_byte(1)             # Map ID?
         pkt.write_fixed1616(1.0)      # Some float?
-        return b'\x16' + pkt.get_bytes()
+        return pkt.get_bytes()
     
 @dataclass
 class TeamInfoPacket(Packet):
@@ -124,6 +130,7 @@ class TeamInfoPacket(Packet):
 
     def serialize(self) -> bytes:
         pkt = PacketWriter()
+        pkt.begin_packet(0x28)
         # --- TEAM 1 (Red) ---
         pkt.write_byte(1)                        # ID
         pkt.write_string("Crimson_Federation")   # Name?
@@ -139,12 +146,13 @@ class TeamInfoPacket(Packet):
         pkt.write_string("Crimson Base")         # Base Name?
         pkt.write_string("The blue team.")       # Description?
         pkt.write_string("Crimson Federation Wins!") # Win Message?
-        return b'\x28' + pkt.get_bytes()
+        return pkt.get_bytes()
     
 @dataclass
 class PingRequestPacket(Packet):
     # PING_REQUEST 0x0B
     def serialize(self) -> bytes:
         pkt = PacketWriter()
+        pkt.begin_packet(0x0B)
         pkt.write_int32(get_ticks())
-        return b'\x0B' + pkt.get_bytes()
\ No newline at end of file
+        return pkt.get_bytes()
\ No newline at end of file
@@ -3,7 +3,35 @@ from dataclasses import dataclass, field
 from network.streams import PacketWriter
 from network.translation_config import GLOBAL_CONFIGS
 from core.config import get_ticks
-from network.packets.base import Packet 
+from network.packets.base import Packet
+
+def _build_translation_body() -> bytes:
+    """
+    The translation table is pure data (GLOBAL_CONFIGS is fixed at import),
+    so the body only needs to be written once.
+    """
+    pkt = PacketWriter()
+
+    # Iterate through the Source of Truth
+    for cfg in GLOBAL_CONFIGS:
+        # 1. Fixed ID / Header Bits
+        pkt.write_int32(cfg['head'])
+
+        # 2. Padding (Ignored by client)
+        pkt.write_int32(0)
+
+        # 3. Max Total Bits (Resolution)
+        pkt.write_int32(cfg['total'])
+
+        # 4. Max Value (String)
+        pkt.write_string(cfg['max'])
+
+        # 5. Range Value (String)
+        pkt.write_string(cfg['range'])
+
+    return pkt.get_bytes()
+
+_TRANSLATION_BODY = _build_translation_body()
 
 @dataclass
 class TranslationPacket(Packet):
@@ -13,27 +41,7 @@ class TranslationPacket(Packet):
     """
 
     def serialize(self) -> bytes:
-        pkt = PacketWriter()
-
-        # Iterate through the Source of Truth
-        for i, cfg in enumerate(GLOBAL_CONFIGS):
-            print(f"[DEBUG] {i}: Max={cfg['max']} Range={cfg['range']}")
-            # 1. Fixed ID / Header Bits
-            pkt.write_int32(cfg['head'])
-            
-            # 2. Padding (Ignored by client)
-            pkt.write_int32(0)
-            
-            # 3. Max Total Bits (Resolution)
-            pkt.write_int32(cfg['total'])
-            
-            # 4. Max Value (String)
-            pkt.write_string(cfg['max'])
-            
-            # 5. Range Value (String)
-            pkt.write_string(cfg['range'])
-        
         # The client code calls Weapon_Slot_Constructor here
         # Then sends ACK2 (Command 0x33, Subcommand 2).
-        
-        return b'\x32' + pkt.get_bytes()
\ No newline at end of file
+
+        return b'\x32' + _TRANSLATION_BODY
@@ -1,137 +1,158 @@
+import struct
+from functools import lru_cache
+from operator import attrgetter
 from network.streams import PacketWriter
 from network.translation_config import *
 from core.config import get_ticks
-from core.entity import GameEntity, UpdateMask
-
-class EntitySerializer:
+from core.entity import (
+    GameEntity, MASK_DEFINITION, MASK_POS, MASK_VEL, MASK_ROT, MASK_SPIN,
+    MASK_HEALTH, MASK_ENERGY, MASK_OWNER,
+)
+
+# Vector fields in the client's read order: (mask bit, getter returning the
+# entity's (x, y, z), compress_vec3 of the matching compressor)
+_VEC_PLAN = (
+    (MASK_POS, attrgetter('pos'), COMPRESSOR_POS.compress_vec3),
+    (MASK_VEL, attrgetter('vel'), COMPRESSOR_VEL.compress_vec3),
+    (MASK_ROT, attrgetter('rot'), COMPRESSOR_ROT.compress_vec3),
+    (MASK_SPIN, attrgetter('spin'), COMPRESSOR_SPIN.compress_vec3),
+)
+
+# The plan specialized for every combination of the four vector bits
+# (mask bits 1-4), so pack_entity loops over exactly the fields present
+# with no per-field bit tests. Index with (mask >> 1) & 0xF.
+_VEC_STEPS = tuple(
+    tuple((get_vec, compress_vec3) for bit, get_vec, compress_vec3 in _VEC_PLAN if (combo << 1) & bit)
+    for combo in range(16)
+)
+# Bits 5-8 that carry a payload (Weapon has no writer yet)
+_STATE_MASKS = MASK_HEALTH | MASK_ENERGY | MASK_OWNER
+
+# Health/Energy are Fixed Mode: always the same width, no header.
+# Their values repeat heavily (full health, the same few HUD levels), so the
+# quantized result is memoized; a cache hit is ~3x cheaper than recomputing.
+_STAT_BITS = COMPRESSOR_STAT.value_bits()
+_stat_value = lru_cache(maxsize=4096)(COMPRESSOR_STAT.compress_value)
+
+# Packet header: [Timestamp:32] (view updates only) [Sequence:32], big endian
+_VIEW_HEADER = struct.Struct(">II")
+_SEQ_HEADER = struct.Struct(">I")
+
+def pack_entity(entity: GameEntity, force_definition=False, forced_mask: int | None = None):
     """
-    Helper class that handles the specific bit-writing order 
-    required by the C++ client's 'WIP_read_array_from_bitstream'.
+    Builds one entity record in the specific bit order required by the
+    C++ client's 'WIP_read_array_from_bitstream'.
+    Returns: (packed_int, total_bits), MSB first.
     """
-    def __init__(self, writer: PacketWriter):
-        self.writer = writer
-
-    def serialize(self, entity: GameEntity, force_definition=False, forced_mask: int | None = None):
-        # 1. Determine the Mask
-        # If forced_mask is provided, use it. Otherwise, use entity's current dirty state.
-        mask = forced_mask if forced_mask is not None else entity.pending_mask
-        
-        # If forcing definition (spawning), ensure Bit 0 is set
-        if force_definition:
-            mask |= UpdateMask.DEFINITION
-            
-        # 2. Write Header (Standard for every entity)
-        self.writer.write_int32(entity.net_id)
-        self.writer.write_bool(entity.is_manned)
-
-        # Ensure we write the calculated 'mask', NOT entity.pending_mask
-        self.writer.write_bits(mask, 10)
-        
-        # Bank Selector
-        # C++ reads Index[0].header bits. We defined this as BANK_SELECTOR_BITS (16).
-        # We write '0' to choose Bank 0 (Index 16).
-        self.writer.write_bits(0, BANK_SELECTOR_BITS) 
-
-        # 3. Handle Bit 0: Definition (The "Creation" block)
-        if mask & UpdateMask.DEFINITION:
-            # unit_type (8 bits usually)
-            self.writer.write_bits(entity.unit_type, ID_BITS_UNIT)
-            # team_id (8 bits)
-            self.writer.write_bits(entity.team_id, ID_BITS_TEAM)
-            # team_id_also_maybe (State/Sub-team)
-            self.writer.write_bits(entity.team_id, ID_BITS_TEAM) 
-
-            # TODO: 37 = decoration, figure out what the ints are for
-            if entity.unit_type == 37:
-                self.writer.write_int32(0)
-                self.writer.write_int32(0)
-            elif entity.unit_type == 19:
-                # Need to store/get actual unit id value, hardcoding 25 for now (Power Cell)
-                self.writer.write_bits(25, ID_BITS_UNIT_CARGO) 
-            
-            # is_teleport_or_snap (Force Snap)
-            self.writer.write_bool(True) 
+    # 1. Determine the Mask
+    # If forced_mask is provided, use it. Otherwise, use entity's current dirty state.
+    mask = forced_mask if forced_mask is not None else entity.pending_mask
+    
+    # If forcing definition (spawning), ensure Bit 0 is set
+    if force_definition:
+        mask |= MASK_DEFINITION
+
+    # 2. Write Header (Standard for every entity)
+    # [NetID:32] [IsManned:1] [Mask:10] [BankSelector:16]
+    # Ensure we write the calculated 'mask', NOT entity.pending_mask
+    # Bank Selector: C++ reads Index[0].header bits. We defined this as
+    # BANK_SELECTOR_BITS (16). We write '0' to choose Bank 0 (Index 16).
+    #
+    # Every field of the entity (header, definition, vectors, stats) is
+    # shifted into one integer 'acc' (MSB first, 'nbits' long). The stream
+    # is not byte-aligned here (local stats + count come first), so a raw
+    # byte copy isn't an option anyway.
+    acc = ((entity.net_id & 0xFFFFFFFF) << 1) | (1 if entity.is_manned else 0)
+    acc = (acc << 10) | (mask & 0x3FF)
+    acc <<= BANK_SELECTOR_BITS
+    nbits = 32 + 1 + 10 + BANK_SELECTOR_BITS
+
+    # 3. Handle Bit 0: Definition (The "Creation" block)
+    if mask & MASK_DEFINITION:
+        # unit_type (8 bits usually)
+        acc = (acc << ID_BITS_UNIT) | (entity.unit_type & ((1 << ID_BITS_UNIT) - 1))
+        # team_id (8 bits)
+        team = entity.team_id & ((1 << ID_BITS_TEAM) - 1)
+        acc = (acc << ID_BITS_TEAM) | team
+        # team_id_also_maybe (State/Sub-team)
+        acc = (acc << ID_BITS_TEAM) | team
+        nbits += ID_BITS_UNIT + 2 * ID_BITS_TEAM
+
+        # TODO: 37 = decoration, figure out what the ints are for
+        if entity.unit_type == 37:
+            acc <<= 64 # Two int32 0s
+            nbits += 64
+        elif entity.unit_type == 19:
+            # Need to store/get actual unit id value, hardcoding 25 for now (Power Cell)
+            acc = (acc << ID_BITS_UNIT_CARGO) | 25
+            nbits += ID_BITS_UNIT_CARGO
         
-        # 4. The Dynamic Data Loop
-        # The C++ client iterates bits 1 through 9. Order is strict.
-
-        # Bit 1: Position
-        if mask & UpdateMask.POS:
-            self._write_vec(entity.pos, COMPRESSOR_POS)
-            
-        # Bit 2: Velocity
-        if mask & UpdateMask.VEL:
-            self._write_vec(entity.vel, COMPRESSOR_VEL)
-            
-        # Bit 3: Rotation
-        if mask & UpdateMask.ROT:
-            self._write_vec(entity.rot, COMPRESSOR_ROT)
-            
-        # Bit 4: Spin (Angular Velocity)
-        if mask & UpdateMask.SPIN:
-            self._write_vec(entity.spin, COMPRESSOR_SPIN) 
-
+        # is_teleport_or_snap (Force Snap)
+        acc = (acc << 1) | 1
+        nbits += 1
+    
+    # 4. The Dynamic Data Loop
+    # The C++ client iterates bits 1 through 9. Order is strict.
+    # Vectors go out at the highest priority the config's header allows
+    # (max resolution), packed [Header][X][Y][Z] by compress_vec3.
+
+    # Bits 1-4: Position, Velocity, Rotation, Spin (Angular Velocity)
+    for get_vec, compress_vec3 in _VEC_STEPS[(mask >> 1) & 0xF]:
+        packed, bits = compress_vec3(*get_vec(entity))
+        acc = (acc << bits) | packed
+        nbits += bits
+
+    # Bits 5-8: Health, Weapon, Energy, Owner
+    # Movement-only updates (the bulk of per-tick traffic) carry none of
+    # these, so one test skips them all.
+    if mask & _STATE_MASKS:
         # Bit 5: Health
-        if mask & UpdateMask.HEALTH:
-            _, val, bits = COMPRESSOR_STAT.compress(entity.health)
-            self.writer.write_bits(val, bits) 
+        if mask & MASK_HEALTH:
+            acc = (acc << _STAT_BITS) | _stat_value(entity.health)
+            nbits += _STAT_BITS
 
         # Bit 6: Weapon Inventory
-        if mask & UpdateMask.WEAPON:
-            # TODO: Implement Net_Read_Weapon_Inventory writer
-            pass 
+        # TODO: Implement Net_Read_Weapon_Inventory writer (nothing is written for it yet)
 
         # Bit 7: Energy
-        if mask & UpdateMask.ENERGY:
-             _, val, bits = COMPRESSOR_STAT.compress(entity.energy)
-             self.writer.write_bits(val, bits)
+        if mask & MASK_ENERGY:
+            acc = (acc << _STAT_BITS) | _stat_value(entity.energy)
+            nbits += _STAT_BITS
 
         # Bit 8: Owner/New Player
-        if mask & UpdateMask.OWNER:
+        if mask & MASK_OWNER:
             # TODO: Implement Owner ID logic if needed
-            self.writer.write_int32(0) 
+            acc <<= 32 # int32 0
+            nbits += 32
 
-        # Bit 9: Hard Update
-        # No payload; just a flag.
-        pass
+    # Bit 9: Hard Update
+    # No payload; just a flag.
 
-    def _write_vec(self, vec, compressor: TranslationConfig):
-        """
-        Writes a 3D vector dynamically matching C++ logic:
-        [Header] [X_Data] [Y_Data] [Z_Data]
-        """
-        # 1. Determine "High Quality" Priority
-        # We want the max resolution defined in the config.
-        # If header_bits is 2, max value is 3 (binary 11).
-        priority = (1 << compressor.precision_header_bits) - 1
-        
-        # 2. Write the Header ONCE
-        # The client reads 'precision_header_bits' here.
-        self.writer.write_bits(priority, compressor.precision_header_bits)
-
-        # 3. Write X, Y, Z
-        for val in vec:
-            # We enforce the priority we just wrote
-            p, compressed_val, num_bits = compressor.compress(val, priority=priority)
-
-            #print(f"[DEBUG] pri={p} val={compressed_val} bits={num_bits}")
-            
-            # Write the compressed int using the calculated bit count
-            self.writer.write_bits(compressed_val, num_bits)
+    return acc, nbits
 
 class UpdateArrayPacket:
     def __init__(self, sequence_id:int, is_view_update=False):
         self.writer = PacketWriter()
-        self.sequence_id = sequence_id
         self.entities = []
+        self.reset(sequence_id, is_view_update)
+
+    def reset(self, sequence_id: int, is_view_update=False):
+        """
+        Starts the packet over for a new tick, reusing the writer's buffer
+        and the entity list instead of allocating new ones.
+        """
+        self.writer.reset()
+        self.sequence_id = sequence_id
+        self.entities.clear()
         self.local_stats = None # Tuple: (Health, Energy)
 
-        # Timestamp
+        # Timestamp + Server Sequence, packed in one go
+        # (the writer was just reset, so this is an aligned byte copy)
+        seq = sequence_id & 0xFFFFFFFF
         if (is_view_update):
-            self.writer.write_int32(get_ticks())
-        
-        # Server Sequence
-        self.writer.write_int32(self.sequence_id)
+            self.writer.write_bytes(_VIEW_HEADER.pack(get_ticks(), seq))
+        else:
+            self.writer.write_bytes(_SEQ_HEADER.pack(seq))
 
     def set_local_stats(self, health: float, energy: float):
         """
@@ -144,33 +165,65 @@ class UpdateArrayPacket:
         """Adds an entity to be serialized in this packet."""
         self.entities.append((entity, force_spawn, forced_mask))
 
-    def get_bytes(self):
+    def add_entities(self, entities, force_spawn=False, forced_mask: int | None = None):
+        """Adds a batch of entities that share the same spawn flag / mask in one call."""
+        self.entities.extend([(entity, force_spawn, forced_mask) for entity in entities])
+
+    def get_bytes(self, record_cache: dict | None = None):
+        """
+        Finalizes the packet and returns the payload.
+        record_cache: optional dict shared by every packet built in one tick
+        (e.g. the broadcast to all clients). Entity records are packed once
+        and reused from it, keyed by (net_id, force_spawn, resolved mask), so
+        the records are a per-tick snapshot of the entities' state. Callers
+        should pass masks snapshotted for the tick (see
+        EntityManager.take_dirty_snapshot) so changes made mid-tick stay
+        pending and are sent on the next one.
+        """
+        writer = self.writer
+
+        # Everything after the header goes out through one batch flush:
+        # the vitals block, the entity count, then every entity record.
+        # (values[i] is written as widths[i] bits, in order)
+
         # --- SECTION 1: Local Stats (The "Weapon State/Vital Stats" part) ---
         if self.local_stats:
-            # The client reads one bit: If 1, it reads stats.
-            self.writer.write_bool(True) 
-            
-            # 5 bits padding/ID (based on your trace)
-            self.writer.write_bits(0, 5) 
-            
-            _, h_val, h_bits = COMPRESSOR_STAT.compress(self.local_stats[0])
-            _, e_val, e_bits = COMPRESSOR_STAT.compress(self.local_stats[1])
-            
-            self.writer.write_bits(h_val, h_bits)
-            self.writer.write_bits(e_val, e_bits)
+            # [HasStats:1 = 1] (the client reads one bit: If 1, it reads stats)
+            # [Padding/ID:5 = 0] (based on your trace)
+            # [Health] [Energy]
+            vitals = (0b100000 << _STAT_BITS) | _stat_value(self.local_stats[0])
+            vitals = (vitals << _STAT_BITS) | _stat_value(self.local_stats[1])
+            values = [vitals]
+            widths = [6 + 2 * _STAT_BITS]
         else:
             # If 0, client skips Parse_SpawnVitalStats
-            self.writer.write_bool(False) 
+            values = [0]
+            widths = [1]
 
         # --- SECTION 2: Entity Loop ---
-        count = len(self.entities)
-        
-        # Total Entity Count (8 bits)
-        self.writer.write_bits(count, 8)
-
-        serializer = EntitySerializer(self.writer)
+        # Total Entity Count (8 bits), then every entity record.
+        # Records are packed first rather than going through the writer
+        # once per entity.
+        values.append(len(self.entities))
+        widths.append(8)
         
-        for entity, force_spawn, forced_mask in self.entities:
-            serializer.serialize(entity, force_definition=force_spawn, forced_mask=forced_mask)
-
-        return self.writer.get_bytes()
\ No newline at end of file
+        if record_cache is None:
+            for entity, force_spawn, forced_mask in self.entities:
+                packed, nbits = pack_entity(entity, force_spawn, forced_mask)
+                values.append(packed)
+                widths.append(nbits)
+        else:
+            for entity, force_spawn, forced_mask in self.entities:
+                mask = forced_mask if forced_mask is not None else entity.pending_mask
+                key = (entity.net_id, force_spawn, mask)
+                record = record_cache.get(key)
+                if record is None:
+                    # Built from the same mask read as the key, so the UDP
+                    # thread can't slip a different mask in between.
+                    record = record_cache[key] = pack_entity(entity, force_spawn, mask)
+                values.append(record[0])
+                widths.append(record[1])
+
+        writer.write_bits_batch(values, widths)
+
+        return writer.get_bytes()
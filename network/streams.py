@@ -1,28 +1,67 @@
 import struct
 import math
+from functools import lru_cache
+
+# Precompiled big-endian formats for the fixed-width fields and the
+# float <-> raw bits round trip. Shared with the transport and logger so each
+# format is compiled once.
+PACK_F32 = struct.Struct(">f")
+PACK_U32 = struct.Struct(">I")
+PACK_U16 = struct.Struct(">H")
+PACK_I32 = struct.Struct(">i")
+
+@lru_cache(maxsize=1024)
+def _encode_pascal(text: str) -> bytes:
+    """Wire bytes for a string: ASCII (? for bad chars) plus the null terminator."""
+    return text.encode('ascii', errors='replace') + b'\x00'
+
+@lru_cache(maxsize=1024)
+def _decode_ascii(raw: bytes) -> str:
+    """Text for a received string's bytes (bad chars dropped). Cached: keys and chat scopes repeat."""
+    return raw.decode('ascii', errors='ignore')
 
 class PacketWriter:
     """
     A unified BitStream writer. 
-    Everything flows through write_bits to ensure alignment is always handled automatically.
+    Anything written mid-byte flows through write_bits to ensure alignment is always handled automatically.
+    Byte-aligned writes take a shortcut straight into the buffer.
     """
     def __init__(self):
         self._buffer = bytearray()
-        self._current_byte = 0
-        self._bit_index = 0  # 0 to 7
+        # Pending bits that don't fill a whole byte yet.
+        # _acc holds them right-aligned, _nbits is how many (0 to 7 between calls).
+        self._acc = 0
+        self._nbits = 0
 
     def _flush_bits(self):
-        """Internal: moves the current byte into the buffer if we have pending bits."""
-        if self._bit_index > 0:
-            self._buffer.append(self._current_byte)
-            self._current_byte = 0
-            self._bit_index = 0
+        """Internal: pads the pending bits with 0s and moves them into the buffer."""
+        if self._nbits > 0:
+            self._buffer.append((self._acc << (8 - self._nbits)) & 0xFF)
+            self._acc = 0
+            self._nbits = 0
 
     def get_bytes(self) -> bytes:
         """Finalizes the stream (pads the last byte with 0s if needed) and returns the payload."""
         self._flush_bits()
         return bytes(self._buffer)
 
+    def begin_packet(self, opcode: int):
+        """
+        Writes the opcode byte at the front of a fresh stream, so get_bytes()
+        returns the full payload (Opcode + Body) without a separate prepend copy.
+        """
+        self._buffer.append(opcode & 0xFF)
+
+    def reset(self):
+        """
+        Empties the stream so the writer can be reused for another packet.
+        Keeps the buffer's allocated storage. get_bytes() returns a copy,
+        so payloads handed out earlier are not affected.
+        """
+        del self._buffer[:]
+        self._acc = 0
+        self._nbits = 0
+
     # ------------------------------------------------------------------
     # CORE BIT LOGIC
     # ------------------------------------------------------------------
@@ -32,34 +71,62 @@ class PacketWriter:
         Writes a raw sequence of bytes.
         Safe to call even if the stream is currently unaligned (mid-byte).
         """
-        for b in data:
-            self.write_byte(b)
+        if self._nbits == 0:
+            # Aligned: straight copy
+            self._buffer.extend(data)
+        else:
+            for b in data:
+                self.write_byte(b)
 
     def write_bits(self, value: int, num_bits: int):
         """
         Writes 'num_bits' from 'value' into the stream.
         Writes from MSB to LSB (Big Endian bit order).
         """
-        # Iterate from the most significant bit down to 0
-        for i in range(num_bits - 1, -1, -1):
-            bit = (value >> i) & 1
-            
-            # Place bit in the current byte at the correct position (7 down to 0)
-            self._current_byte |= bit << (7 - self._bit_index)
-            self._bit_index += 1
+        # Shift the new bits in below the pending ones (masking handles negatives)
+        acc = (self._acc << num_bits) | (value & ((1 << num_bits) - 1))
+        nbits = self._nbits + num_bits
+
+        # Push out every completed byte, most significant first.
+        # A single byte is one append; wider fields go out in one to_bytes call.
+        if nbits >= 16:
+            full_bytes = nbits >> 3
+            nbits &= 7
+            self._buffer += (acc >> nbits).to_bytes(full_bytes, 'big')
+        elif nbits >= 8:
+            nbits -= 8
+            self._buffer.append((acc >> nbits) & 0xFF)
+
+        # Keep only the leftover bits so the accumulator stays small
+        # (never more than 7 between calls)
+        self._acc = acc & ((1 << nbits) - 1)
+        self._nbits = nbits
+
+    def write_bits_batch(self, values, widths):
+        """
+        Writes several bit fields back to back, same as calling
+        write_bits(value, width) for each pair in order.
+        Everything is packed into the accumulator first and the completed
+        bytes are flushed with one to_bytes call.
+        """
+        acc = self._acc
+        nbits = self._nbits
+        for value, width in zip(values, widths):
+            acc = (acc << width) | (value & ((1 << width) - 1))
+            nbits += width
 
-            # If byte is full, push to buffer and reset
-            if self._bit_index == 8:
-                self._buffer.append(self._current_byte)
-                self._current_byte = 0
-                self._bit_index = 0
+        full_bytes = nbits >> 3
+        if full_bytes:
+            nbits &= 7
+            self._buffer += (acc >> nbits).to_bytes(full_bytes, 'big')
+            acc &= (1 << nbits) - 1
+
+        self._acc = acc
+        self._nbits = nbits
 
     def align(self):
         """Forces the stream to jump to the next byte boundary."""
-        if self._bit_index > 0:
-            self._buffer.append(self._current_byte)
-            self._current_byte = 0
-            self._bit_index = 0
+        self._flush_bits()
 
     # ------------------------------------------------------------------
     # STANDARD TYPES (Mapped to Bits)
@@ -69,19 +136,32 @@ class PacketWriter:
         """Writes 1 bit."""
         self.write_bits(1 if value else 0, 1)
 
+    # When the stream is byte-aligned (the common case) the fixed-width types
+    # are packed straight into the buffer by the struct module, skipping the
+    # generic bit accumulator entirely.
+
     def write_byte(self, value: int):
         """Writes 8 bits (unsigned)."""
-        self.write_bits(value, 8)
+        if self._nbits == 0:
+            self._buffer.append(value & 0xFF)
+        else:
+            self.write_bits(value, 8)
 
     def write_int16(self, value: int):
         """Writes 16 bits (Big Endian)."""
         # Handle negative numbers by masking to 16 bits
-        self.write_bits(value & 0xFFFF, 16)
+        if self._nbits == 0:
+            self._buffer += PACK_U16.pack(value & 0xFFFF)
+        else:
+            self.write_bits(value & 0xFFFF, 16)
 
     def write_int32(self, value: int):
         """Writes 32 bits (Big Endian)."""
         # Handle negative numbers by masking to 32 bits
-        self.write_bits(value & 0xFFFFFFFF, 32)
+        if self._nbits == 0:
+            self._buffer += PACK_U32.pack(value & 0xFFFFFFFF)
+        else:
+            self.write_bits(value & 0xFFFFFFFF, 32)
 
     # ------------------------------------------------------------------
     # WULFRAM SPECIFIC TYPES
@@ -92,10 +172,11 @@ class PacketWriter:
         Writes a standard IEEE 754 float (32-bit).
         Used for generic floating point data.
         """
-        # Pack as float, unpack as int to get the bits
-        packed = struct.pack(">f", value)
-        int_val = struct.unpack(">I", packed)[0]
-        self.write_bits(int_val, 32)
+        if self._nbits == 0:
+            self._buffer += PACK_F32.pack(value)
+        else:
+            # Pack as float, unpack as int to get the bits
+            self.write_bits(PACK_U32.unpack(PACK_F32.pack(value))[0], 32)
 
     def write_fixed1616(self, value: float):
         """
@@ -104,7 +185,10 @@ class PacketWriter:
         """
         raw = int(round(value * 65536.0))
         # Mask to 32 bits to handle 2's complement negatives correctly
-        self.write_bits(raw & 0xFFFFFFFF, 32)
+        if self._nbits == 0:
+            self._buffer += PACK_U32.pack(raw & 0xFFFFFFFF)
+        else:
+            self.write_bits(raw & 0xFFFFFFFF, 32)
 
     def write_string(self, text: str):
         """
@@ -112,11 +196,9 @@ class PacketWriter:
         Note: Based on your previous code, Wulfram strings seem to include a null terminator 
         counted in the length.
         """
-        if text is None:
-            text = ""
-        
         # Encode to ASCII, defaulting to ? for bad chars
-        raw_data = text.encode('ascii', errors='replace') + b'\x00'
+        # (cached: names and status strings repeat a lot)
+        raw_data = _encode_pascal(text or "")
         
         length = len(raw_data)
         
@@ -124,8 +206,12 @@ class PacketWriter:
         self.write_int16(length)
         
         # 2. Write Characters
-        for byte_val in raw_data:
-            self.write_byte(byte_val)
+        if self._nbits == 0:
+            # Aligned (the usual case): copy the bytes in one go
+            self._buffer += raw_data
+        else:
+            # Mid-byte: push the whole string through the bit writer as one field
+            self.write_bits(int.from_bytes(raw_data, 'big'), length * 8)
 
     def write_vector3(self, x: float, y: float, z: float):
         """Helper to write 3 fixed-point numbers."""
@@ -138,6 +224,7 @@ class PacketReader:
     """
     A unified BitStream Reader.
     Allows reading bits, bytes, and Wulfram types from a raw buffer.
+    Accepts any bytes-like object (bytes, bytearray, memoryview).
     """
     def __init__(self, data: bytes):
         self._data = data
@@ -153,6 +240,15 @@ class PacketReader:
 
     def read_bits(self, num_bits: int) -> int:
         """Reads 'num_bits' and returns the integer value."""
+        # Fast path: whole bytes from a byte boundary
+        if self._bit_pos == 0 and num_bits & 7 == 0:
+            pos = self._byte_pos
+            end = pos + (num_bits >> 3)
+            if end <= self._total_bytes:
+                self._byte_pos = end
+                return int.from_bytes(self._data[pos:end], 'big')
+
+        # Slow path: bit by bit (unaligned fields, e.g. quantized floats)
         value = 0
         for _ in range(num_bits):
             if self._byte_pos >= self._total_bytes:
@@ -196,15 +292,29 @@ class PacketReader:
         return result
 
     def read_byte(self) -> int:
+        if self._bit_pos == 0 and self._byte_pos < self._total_bytes:
+            val = self._data[self._byte_pos]
+            self._byte_pos += 1
+            return val
         return self.read_bits(8)
 
     def read_int16(self) -> int:
+        if self._bit_pos == 0 and self._byte_pos + 2 <= self._total_bytes:
+            (val,) = PACK_U16.unpack_from(self._data, self._byte_pos)
+            self._byte_pos += 2
+            return val
+
         val = self.read_bits(16)
         # Sign extension logic if you need signed shorts:
         # if val & 0x8000: val -= 0x10000
         return val
 
     def read_int32(self) -> int:
+        if self._bit_pos == 0 and self._byte_pos + 4 <= self._total_bytes:
+            (val,) = PACK_I32.unpack_from(self._data, self._byte_pos)
+            self._byte_pos += 4
+            return val
+
         val = self.read_bits(32)
         
         # Check the 32nd bit (the sign bit)
@@ -220,33 +330,25 @@ class PacketReader:
         if length <= 0 or length > 4096: # Sanity check
             return ""
             
-        # We read bytes manually to respect bit alignment 
-        # (though usually strings are byte-aligned)
-        raw_bytes = bytearray()
-        for _ in range(length):
-            raw_bytes.append(self.read_byte())
+        pos = self._byte_pos
+        if self._bit_pos == 0 and pos + length <= self._total_bytes:
+            # Aligned and fully present (the usual case): slice it out directly
+            raw_bytes = bytes(self._data[pos:pos + length])
+            self._byte_pos = pos + length
+        else:
+            # We read bytes manually to respect bit alignment
+            raw_bytes = bytes([self.read_byte() for _ in range(length)])
             
         # Remove null terminator if present at end
-        if raw_bytes and raw_bytes[-1] == 0:
-            raw_bytes.pop()
+        if raw_bytes[-1] == 0:
+            raw_bytes = raw_bytes[:-1]
             
-        return raw_bytes.decode('ascii', errors='ignore')
+        return _decode_ascii(raw_bytes)
     
     def read_quantized_float(self, config) -> float:
         """
         Reads a quantized float using the provided TranslationConfig.
         Handles both Fixed Mode (Stats, Actions) and Dynamic Mode (Vectors).
+        Hot loops can call config.read(reader) directly and skip this hop.
         """
-        # 1. Check if we are in Fixed Mode or Dynamic Mode
-        if config.max_total_bits <= 0:
-            # Fixed Mode: No Header is written. Priority is implicitly 0.
-            priority = 0
-            current_bits = config.precision_base_bits
-            raw_val = self.read_bits(current_bits)
-            return config.decompress(priority, raw_val)
-        else:
-            # Dynamic Mode: Read Header first.
-            priority = self.read_bits(config.precision_header_bits)
-            current_bits = config.precision_base_bits + priority
-            raw_val = self.read_bits(current_bits)
-            return config.decompress(priority, raw_val)
\ No newline at end of file
+        return config.read(self)
@@ -27,86 +27,167 @@ class TranslationConfig:
             if self.precision_base_bits < 1:
                 self.precision_base_bits = 1
 
+        # Precompute everything compress/decompress need per priority level.
+        # Fixed Mode only ever uses priority 0.
+        if self.max_total_bits <= 0:
+            priorities = 1
+        else:
+            priorities = 1 << self.precision_header_bits
+        self._max_priority = priorities - 1
+
+        # Total Bits per priority: base + priority
+        self._bits = [self.precision_base_bits + p for p in range(priorities)]
+
+        # Denominator (Max Steps) per priority
+        # C++: (2 * (1 << (bit_count - 1)) - 2)
+        # Simplified: (1 << current_bits) - 2
+        self._denoms = [max(1, (1 << bits) - 2) for bits in self._bits]
+
+        # A zero range means Max == Min, so every clamped value sits on Max and
+        # the delta is 0. Dividing by 1 then yields Raw = 1 / Result = Max,
+        # same as the explicit range == 0 checks, without the branch.
+        self._safe_range = self.range if self.range != 0 else 1.0
+
+        self.read = self._build_reader()
+
+    def _build_reader(self):
+        """
+        Builds read(reader) -> float, a decoder specialized for this config.
+        The Fixed/Dynamic branch and the bit counts are resolved here, once,
+        instead of on every float read. Same result as decompress().
+        """
+        max_value = self.max_value
+        value_range = self.range
+        denoms = self._denoms
+
+        if self.max_total_bits <= 0:
+            # Fixed Mode: no header, priority is implicitly 0
+            bits = self.precision_base_bits
+            denom = denoms[0]
+
+            def read(reader):
+                raw_val = reader.read_bits(bits)
+                if raw_val == 0:
+                    return 0.0
+                return max_value - ((raw_val - 1) * value_range) / denom
+        else:
+            # Dynamic Mode: header first, then base + priority bits
+            header_bits = self.precision_header_bits
+            base_bits = self.precision_base_bits
+
+            def read(reader):
+                priority = reader.read_bits(header_bits)
+                raw_val = reader.read_bits(base_bits + priority)
+                if raw_val == 0:
+                    return 0.0
+                return max_value - ((raw_val - 1) * value_range) / denoms[priority]
+
+        return read
+
     def compress(self, float_val, priority=3):
         """
         Returns: (header_value, compressed_int, num_bits)
         Inverse compression to match 'Unpack_Float_From_Int'.
         """
-        # 1. Determine Total Bits (The Denominator Logic)
-        if self.max_total_bits <= 0:
-            # Fixed Mode (Stats)
-            current_bits = self.precision_base_bits
-            priority = 0 # Force 0 for fixed
-        else:
-            # Dynamic Mode (Vectors)
-            # Clamp priority to the header size (e.g., 2 bits = max 3)
-            max_p = (1 << self.precision_header_bits) - 1
-            if priority > max_p: priority = max_p
-            current_bits = self.precision_base_bits + priority
+        # 1. Clamp priority to the header size (e.g., 2 bits = max 3)
+        # Fixed Mode (Stats) has a max of 0, which forces priority 0.
+        if priority > self._max_priority:
+            priority = self._max_priority
 
         # 2. SPECIAL CASE: Absolute Zero
         # C++: if (!raw_integer_value) return 0.0;
         # If the value is exactly 0.0, we send 0 to save precision logic.
         if float_val == 0.0:
-            return priority, 0, current_bits
+            return priority, 0, self._bits[priority]
 
-        # 3. Calculate Denominator (Max Steps)
-        # C++: (2 * (1 << (bit_count - 1)) - 2)
-        # Simplified: (1 << current_bits) - 2
-        # This gives us the range of valid integers [1, Denominator + 1]
-        denom = (1 << current_bits) - 2
-        if denom <= 0: denom = 1 # Safety
-
-        # 4. Clamp Input
-        if float_val > self.max_value: float_val = self.max_value
+        # 3. Clamp Input
+        # (plain comparisons on purpose: min()/max() calls measure ~10x slower in CPython)
+        max_value = self.max_value
+        if float_val > max_value: float_val = max_value
         if float_val < self.min_value: float_val = self.min_value
 
-        # 5. Inverse Quantization Formula
+        # 4. Inverse Quantization Formula
         # C++ Result = Max - (Raw - 1) * Range / Denom
         # Therefore: Raw - 1 = (Max - Result) * Denom / Range
         # Raw = ((Max - Result) * Denom / Range) + 1
-        
-        if self.range == 0:
-            raw_val = 1
-        else:
-            # How far are we from the Max?
-            delta = self.max_value - float_val
-            
-            # Scale that delta to integer steps
-            scaled = (delta * denom) / self.range
-            raw_val = int(scaled) + 1
-
-        return priority, raw_val, current_bits
+        # (The multiply-then-divide order matters: it keeps Min landing exactly on Denom + 1)
+        raw_val = int(((max_value - float_val) * self._denoms[priority]) / self._safe_range) + 1
+
+        return priority, raw_val, self._bits[priority]
+
+    def value_bits(self, priority=3) -> int:
+        """Bit width of one compressed value at 'priority' (header not included)."""
+        if priority > self._max_priority:
+            priority = self._max_priority
+        return self._bits[priority]
+
+    def compress_value(self, float_val, priority=3) -> int:
+        """
+        Returns only the compressed int, masked to value_bits(priority).
+        For callers that already know the width (e.g. Fixed Mode stats),
+        so the hot path doesn't build and unpack compress()'s tuple.
+        Same math as compress().
+        """
+        if priority > self._max_priority:
+            priority = self._max_priority
+
+        if float_val == 0.0:
+            return 0
+
+        max_value = self.max_value
+        if float_val > max_value: float_val = max_value
+        if float_val < self.min_value: float_val = self.min_value
+
+        raw_val = int(((max_value - float_val) * self._denoms[priority]) / self._safe_range) + 1
+        return raw_val & ((1 << self._bits[priority]) - 1)
+
+    def compress_vec3(self, x, y, z, priority=None):
+        """
+        Compresses a 3D vector straight into its wire form:
+        [Header] [X_Data] [Y_Data] [Z_Data], MSB first.
+        Returns: (packed_int, total_bits)
+        priority=None picks the highest the header allows (best resolution).
+        Fixed Mode has no header on the wire, only the three values.
+        Same math as compress().
+        """
+        max_priority = self._max_priority
+        if priority is None or priority > max_priority:
+            priority = max_priority
+
+        max_value = self.max_value
+        min_value = self.min_value
+        denom = self._denoms[priority]
+        safe_range = self._safe_range
+        bits = self._bits[priority]
+        value_mask = (1 << bits) - 1
+
+        packed = priority
+        for float_val in (x, y, z):
+            if float_val == 0.0:
+                packed <<= bits
+                continue
+            if float_val > max_value: float_val = max_value
+            if float_val < min_value: float_val = min_value
+            packed = (packed << bits) | ((int(((max_value - float_val) * denom) / safe_range) + 1) & value_mask)
+
+        header_bits = self.precision_header_bits if self.max_total_bits > 0 else 0
+        return packed, header_bits + 3 * bits
     
     def decompress(self, priority: int, raw_val: int) -> float:
         """
         Reconstructs the float value from the raw integer and priority header.
         Matches C++ 'Unpack_Float_From_Int'.
         """
-        # 1. Determine Total Bits
-        if self.max_total_bits <= 0:
-            current_bits = self.precision_base_bits
-        else:
-            current_bits = self.precision_base_bits + priority
-
-        # 2. Special Case: Zero
+        # 1. Special Case: Zero
         if raw_val == 0:
             return 0.0
 
-        # 3. Calculate Denominator
-        denom = (1 << current_bits) - 2
-        if denom <= 0: denom = 1
+        # 2. Fixed Mode has no header, priority is implicitly 0
+        if self.max_total_bits <= 0:
+            priority = 0
 
-        # 4. Calculate Float
-        if self.range == 0:
-            return self.max_value
-        
         # Formula: Result = Max - ((Raw - 1) * Range / Denom)
-        scaled = raw_val - 1
-        delta = (scaled * self.range) / denom
-        result = self.max_value - delta
-
-        return result
+        return self.max_value - ((raw_val - 1) * self.range) / self._denoms[priority]
 
 # --- GLOBAL CONFIGURATION ---
 # --- THE SOURCE OF TRUTH (DATA) ---
@@ -194,15 +275,26 @@ ID_BITS_UNIT_CARGO = GLOBAL_CONFIGS[4]['head']
 BANK_SELECTOR_BITS = GLOBAL_CONFIGS[0]['head']
 
 
-# Simple Cache for reusing TranslationConfig objects for Action lookups
-_config_cache = {}
+# Every table slot built up front (the table is fixed at import),
+# so Action lookups are a plain tuple index with no first-use cost.
+# Slots with identical settings share one instance (the 12 vector bank
+# slots collapse to 4), keyed by (head, total, max, range).
+def _build_table(configs):
+    built = {}
+    table = []
+    for cfg in configs:
+        key = (cfg['head'], cfg['total'], cfg['max'], cfg['range'])
+        c = built.get(key)
+        if c is None:
+            c = built[key] = _make(cfg)
+        table.append(c)
+    return tuple(table)
+
+_CONFIGS = _build_table(GLOBAL_CONFIGS)
+_DEFAULT_CONFIG = _make(SCALAR_DEFAULT)
 
 def get_config_by_index(index: int) -> TranslationConfig:
     """Returns the TranslationConfig object for a given global table index."""
-    if index < 0 or index >= len(GLOBAL_CONFIGS):
-        return _make(SCALAR_DEFAULT) # Fallback
-    
-    if index not in _config_cache:
-        _config_cache[index] = _make(GLOBAL_CONFIGS[index])
-    
-    return _config_cache[index]
\ No newline at end of file
+    if 0 <= index < len(_CONFIGS):
+        return _CONFIGS[index]
+    return _DEFAULT_CONFIG # Fallback
@@ -1,8 +1,17 @@
 # network/transport/envelope.py
 from __future__ import annotations
-import struct
+import socket
 from dataclasses import dataclass
 
+# Wulfram length headers are u16 big-endian
+from network.streams import PACK_U16
+
+# One single-byte bytes object per opcode, so prefixing a body is a lookup
+OPCODE_BYTES = tuple(bytes((i,)) for i in range(256))
+
+# sendmsg (scatter/gather) isn't available on Windows; both transports check this
+HAS_SENDMSG = hasattr(socket.socket, "sendmsg")
+
 @dataclass(frozen=True)
 class PacketEnvelope:
     """Represents one logical packet: opcode byte + body bytes (excluding TCP length)."""
@@ -10,7 +19,7 @@ class PacketEnvelope:
     body: bytes  # body excludes opcode
 
     def to_payload(self) -> bytes:
-        return bytes([self.opcode]) + self.body
+        return OPCODE_BYTES[self.opcode] + self.body
 
 class TcpEnvelope:
     """
@@ -21,26 +30,29 @@ class TcpEnvelope:
     @staticmethod
     def encode(payload: bytes) -> bytes:
         total_len = len(payload) + 2
-        return struct.pack(">H", total_len) + payload
+        return PACK_U16.pack(total_len) + payload
+
+    @staticmethod
+    def encode_header(payload_len: int) -> bytes:
+        """Just the 2-byte length header, for senders that gather header + payload themselves."""
+        return PACK_U16.pack(payload_len + 2)
 
     @staticmethod
     def decode_header(hdr2: bytes) -> int:
-        (total_len,) = struct.unpack(">H", hdr2)
+        (total_len,) = PACK_U16.unpack_from(hdr2)
         return total_len
 
 class UdpEnvelope:
     """
     Some UDP packets appear raw (no length header), but sometimes include:
       [u16_be total_len == datagram_len] [payload...]
-    This unpacks safely.
+    This unpacks safely. Works on bytes or a memoryview (the strip is then zero-copy).
     """
     @staticmethod
     def try_strip_length(datagram: bytes) -> bytes:
         if len(datagram) >= 3:
-            try:
-                declared = struct.unpack(">H", datagram[:2])[0]
-                if declared == len(datagram):
-                    return datagram[2:]
-            except Exception:
-                pass
+            # u16 big-endian read straight off the first two bytes (length is checked above)
+            declared = (datagram[0] << 8) | datagram[1]
+            if declared == len(datagram):
+                return datagram[2:]
         return datagram
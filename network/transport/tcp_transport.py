@@ -2,29 +2,76 @@
 from __future__ import annotations
 import socket
 from typing import Optional
-from .envelope import TcpEnvelope
+from .envelope import TcpEnvelope, HAS_SENDMSG
 
-def recv_exact(sock: socket.socket, n: int) -> Optional[bytes]:
-    buf = b""
-    while len(buf) < n:
-        chunk = sock.recv(n - len(buf))
-        if not chunk:
-            return None
-        buf += chunk
-    return buf
+class BufferedSocketReader:
+    """
+    Serves exact-length reads out of one reusable receive buffer.
+    Each recv pulls in as much as the socket has ready (up to bufsize),
+    so a burst of small packets costs one syscall instead of two per packet.
+    """
+    def __init__(self, sock: socket.socket, bufsize: int = 65536):
+        self.sock = sock
+        self._buf = bytearray(bufsize)
+        self._head = 0 # First unread byte
+        self._tail = 0 # End of received data
+
+    def read_exact(self, n: int) -> Optional[bytes]:
+        if n <= 0:
+            return b""
+
+        while self._tail - self._head < n:
+            if len(self._buf) - self._head < n:
+                self._make_room(n)
+            view = memoryview(self._buf)
+            try:
+                r = self.sock.recv_into(view[self._tail:])
+            finally:
+                view.release()
+            if not r:
+                return None
+            self._tail += r
+
+        start = self._head
+        self._head = start + n
+        if self._head == self._tail:
+            # Drained: rewind so the next recv starts at the front
+            self._head = self._tail = 0
+        # One copy straight out of the buffer (slicing the bytearray itself
+        # would copy once more). Views are released so the buffer can resize.
+        with memoryview(self._buf) as view, view[start:start + n] as chunk:
+            return bytes(chunk)
+
+    def _make_room(self, n: int) -> None:
+        """Moves unread bytes to the front, growing the buffer if n won't fit at all."""
+        pending = self._tail - self._head
+        self._buf[:pending] = self._buf[self._head:self._tail]
+        self._head = 0
+        self._tail = pending
+        if len(self._buf) < n:
+            self._buf.extend(bytes(n - len(self._buf)))
 
 class TcpTransport:
     def __init__(self, sock: socket.socket):
         self.sock = sock
+        self.reader = BufferedSocketReader(sock)
 
     def send_payload(self, payload: bytes) -> None:
-        framed = TcpEnvelope.encode(payload)
-        self.sock.sendall(framed)
+        if not HAS_SENDMSG:
+            self.sock.sendall(TcpEnvelope.encode(payload))
+            return
+
+        # Gather header + payload in one syscall, without building the framed copy
+        hdr = TcpEnvelope.encode_header(len(payload))
+        sent = self.sock.sendmsg((hdr, payload))
+        if sent < len(hdr) + len(payload):
+            # Partial send (full socket buffer): push the rest the simple way
+            self.sock.sendall((hdr + payload)[sent:])
 
     def recv_payload(self) -> Optional[bytes]:
-        hdr = recv_exact(self.sock, 2)
+        hdr = self.reader.read_exact(2)
         if not hdr:
             return None
         total_len = TcpEnvelope.decode_header(hdr)
-        body = recv_exact(self.sock, total_len - 2)
+        body = self.reader.read_exact(total_len - 2)
         return body
@@ -2,51 +2,113 @@
 from __future__ import annotations
 import socket
 from typing import Iterator
-from .envelope import UdpEnvelope
+from .envelope import UdpEnvelope, OPCODE_BYTES, HAS_SENDMSG
+
+# --- Batching Table ---
+# How far one packet extends inside a datagram, per opcode: (mode, arg)
+#   SIZE_REST:        the packet runs to the end of the datagram
+#   SIZE_LEN_BYTE_AT: a 1-byte body length sits 'arg' bytes after the opcode
+#                     byte; the packet is [Op][...][Len][Body...]
+#   SIZE_SKIP_REST:   like SIZE_REST, but the packet is dropped here without
+#                     being yielded (no slice, no dispatch, no logging)
+# TODO: need to revisit this because it may not be needed...
+SIZE_REST = 0
+SIZE_LEN_BYTE_AT = 1
+SIZE_SKIP_REST = 2
+
+PACKET_SIZER: list[tuple[int, int]] = [(SIZE_REST, 0)] * 256
+# 0x00 (Debug String) has an explicit internal length: [00][Len][Str...]
+PACKET_SIZER[0x00] = (SIZE_LEN_BYTE_AT, 1)
+# Traffic we have no handler for and deliberately ignore (keep-alive 0x40 etc.).
+# NOTE: a handler registered for one of these never runs until its entry is
+# set back to (SIZE_REST, 0).
+for _op in (0x09, 0x10, 0x40, 0x49):
+    PACKET_SIZER[_op] = (SIZE_SKIP_REST, 0)
+del _op
+
+# Largest datagram we accept (longer ones are truncated by the kernel)
+RECV_BUFFER_SIZE = 2048
 
 class UdpTransport:
+    # Diagnostics: packets dropped by SIZE_SKIP_REST entries
+    skipped_packets = 0
+
     def __init__(self, sock: socket.socket):
         self.sock = sock
+        # Bound once; every outgoing datagram goes through these
+        self._sendto = sock.sendto
+        self._sendmsg = sock.sendmsg if HAS_SENDMSG else None
+        # One receive buffer reused for every datagram
+        self._recv_buf = bytearray(RECV_BUFFER_SIZE)
+        self._recv_view = memoryview(self._recv_buf)
+        self._recvfrom_into = sock.recvfrom_into
+
+    def recv(self) -> tuple[memoryview, tuple[str, int]]:
+        """
+        Blocks for the next datagram and returns (data, addr).
+        'data' is a view over the transport's reused receive buffer: it is only
+        valid until the next recv(), so copy anything that must outlive the handler.
+        """
+        n, addr = self._recvfrom_into(self._recv_buf)
+        return self._recv_view[:n], addr
 
     def send(self, payload: bytes, addr: tuple[str, int]) -> None:
         """
         Sends a packet payload (Opcode + Body) to the specified address.
         """
-        self.sock.sendto(payload, addr)
+        self._sendto(payload, addr)
+
+    def send_packet(self, opcode: int, body: bytes, addr: tuple[str, int]) -> None:
+        """
+        Sends [Opcode][Body] to the specified address.
+        The opcode byte and body are gathered by the kernel, so the joined
+        payload is never built in Python.
+        """
+        if self._sendmsg is not None:
+            self._sendmsg((OPCODE_BYTES[opcode], body), (), 0, addr)
+        else:
+            self._sendto(OPCODE_BYTES[opcode] + body, addr)
 
     @staticmethod
-    def parse_datagram(datagram: bytes) -> Iterator[bytes]:
+    def parse_datagram(datagram: bytes) -> Iterator[memoryview]:
         """
         Parses a raw UDP datagram into one or more packet payloads.
         Handles Wulfram's optional length header and packet batching.
+        Payloads are memoryview slices over the datagram (no per-packet copy);
+        handlers that need real bytes must convert with bytes().
         """
         # 1. Strip the optional 2-byte total length header if present
-        data = UdpEnvelope.try_strip_length(datagram)
+        # (on the view, so stripping doesn't copy the datagram either)
+        data = UdpEnvelope.try_strip_length(memoryview(datagram))
         
-        cursor = 0
         total_len = len(data)
-        
+        if not total_len:
+            return
+
+        # Fast path: the leading packet runs to the end (one packet per datagram,
+        # by far the common case), so hand the whole view over without the loop
+        mode = PACKET_SIZER[data[0]][0]
+        if mode == SIZE_REST:
+            yield data
+            return
+
+        cursor = 0
         while cursor < total_len:
-            # Need at least 1 byte for OpCode
-            if (total_len - cursor) < 1:
-                break
-                
-            opcode = data[cursor]
-            
-            # --- Batching Logic ---
-            # TODO: need to revisit this because it may not be needed...
-            # 0x00 (Debug String) has an explicit internal length: [00][Len][Str...]
-            if opcode == 0x00:
-                if (total_len - cursor) >= 2:
-                    str_len = data[cursor + 1]
-                    pkt_size = 1 + 1 + str_len # Op + LenByte + String
-                    
-                    if (cursor + pkt_size) <= total_len:
-                        yield data[cursor : cursor + pkt_size]
-                        cursor += pkt_size
-                        continue
+            mode, arg = PACKET_SIZER[data[cursor]]
+
+            if mode == SIZE_LEN_BYTE_AT and cursor + arg < total_len:
+                pkt_size = arg + 1 + data[cursor + arg] # Op + Header + Body
+
+                if (cursor + pkt_size) <= total_len:
+                    yield data[cursor : cursor + pkt_size]
+                    cursor += pkt_size
+                    continue
             
+            if mode == SIZE_SKIP_REST:
+                UdpTransport.skipped_packets += 1
+                break
+
             # Default: Consume the rest of the datagram as a single packet
             # (Most Wulfram packets are 1 per datagram or last in batch)
             yield data[cursor:]
-            break
\ No newline at end of file
+            break
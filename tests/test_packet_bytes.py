@@ -0,0 +1,157 @@
+"""
+Byte-for-byte checks for the packet writers.
+
+The expected digests were taken from the plain bit-by-bit writer the fast
+paths replaced, so any change to the bytes the client receives shows up
+here. Everything is driven by fixed seeds; run with
+`python -m unittest discover -s tests` (or `python -m pytest tests`).
+"""
+import hashlib
+import random
+import unittest
+
+from core.entity import GameEntity
+from network.streams import PacketWriter
+from network.packets.update_array import UpdateArrayPacket
+
+STREAM_SEED = 1234
+UPDATE_SEED = 4321
+
+# sha256 of the streams built below, as produced by the reference writer
+STREAM_DIGEST = "87331a9a1768a66b7b493909d21912d9ba3824d2d155bd72cc92329cb49230a9"
+UPDATE_DIGEST = "041b4269d26ac6dcdf16c793a6653f52ab099f32abf5bb7f548ff690717e5e14"
+
+
+def _stream_ops(seed: int):
+    """A fixed mix of bit fields and aligned/unaligned fixed-width writes."""
+    rnd = random.Random(seed)
+    ops = []
+    for _ in range(3000):
+        op = rnd.randint(0, 9)
+        if op <= 2:
+            # Runs of raw bit fields, the shape write_bits_batch is used for
+            run = []
+            for _ in range(rnd.randint(1, 12)):
+                width = rnd.randint(1, 64)
+                run.append((rnd.getrandbits(width + 3) - 4, width))
+            ops.append(("bits", run))
+        elif op == 3:
+            ops.append(("write_int16", rnd.randint(-2**15, 2**16 - 1)))
+        elif op == 4:
+            ops.append(("write_int32", rnd.randint(-2**31, 2**32 - 1)))
+        elif op == 5:
+            ops.append(("write_float", rnd.uniform(-1e6, 1e6)))
+        elif op == 6:
+            ops.append(("write_fixed1616", rnd.uniform(-1e3, 1e3)))
+        elif op == 7:
+            text = "".join(chr(rnd.randint(32, 126)) for _ in range(rnd.randint(0, 12)))
+            ops.append(("write_string", text))
+        elif op == 8:
+            ops.append(("write_bytes", bytes(rnd.getrandbits(8) for _ in range(rnd.randint(0, 9)))))
+        else:
+            ops.append(("write_bool", rnd.random() < 0.5))
+    return ops
+
+
+def _build_stream(ops, batched: bool) -> bytes:
+    writer = PacketWriter()
+    for name, arg in ops:
+        if name == "bits":
+            if batched:
+                writer.write_bits_batch([v for v, _ in arg], [w for _, w in arg])
+            else:
+                for value, width in arg:
+                    writer.write_bits(value, width)
+        else:
+            getattr(writer, name)(arg)
+    return writer.get_bytes()
+
+
+def _build_update_packets(seed: int, record_cache=None):
+    """Several non-view update packets over a shared pool of entities."""
+    rnd = random.Random(seed)
+
+    def vec():
+        return (rnd.uniform(-600.0, 600.0), rnd.uniform(-600.0, 600.0), rnd.uniform(-100.0, 100.0))
+
+    entities = [
+        GameEntity(
+            net_id=rnd.getrandbits(32),
+            unit_type=rnd.choice((0, 1, 5, 19, 37)),
+            team_id=rnd.randint(0, 3),
+            pos=vec(), vel=vec(), rot=vec(), spin=vec(),
+            health=rnd.choice((1.0, 0.5, rnd.random())),
+            energy=rnd.random(),
+            is_manned=rnd.random() < 0.5,
+            pending_mask=rnd.getrandbits(10),
+        )
+        for _ in range(40)
+    ]
+
+    payloads = []
+    for seq in range(20):
+        packet = UpdateArrayPacket(seq, is_view_update=False)
+        if rnd.random() < 0.5:
+            packet.set_local_stats(rnd.random(), rnd.random())
+        for entity in rnd.sample(entities, rnd.randint(0, 25)):
+            forced_mask = rnd.getrandbits(10) if rnd.random() < 0.3 else None
+            packet.add_entity(entity, rnd.random() < 0.2, forced_mask)
+        if record_cache is None:
+            payloads.append(packet.get_bytes())
+        else:
+            payloads.append(packet.get_bytes(record_cache))
+    return payloads
+
+
+def _digest(chunks) -> str:
+    h = hashlib.sha256()
+    for chunk in chunks:
+        h.update(len(chunk).to_bytes(4, "big"))
+        h.update(chunk)
+    return h.hexdigest()
+
+
+class PacketWriterBytesTest(unittest.TestCase):
+    def test_write_bits_matches_reference(self):
+        data = _build_stream(_stream_ops(STREAM_SEED), batched=False)
+        self.assertEqual(_digest([data]), STREAM_DIGEST)
+
+    def test_write_bits_batch_matches_write_bits(self):
+        ops = _stream_ops(STREAM_SEED)
+        self.assertEqual(_build_stream(ops, batched=True), _build_stream(ops, batched=False))
+
+    def test_aligned_fast_paths(self):
+        writer = PacketWriter()
+        writer.write_int16(-2)
+        writer.write_int32(0x12345678)
+        writer.write_float(1.5)
+        writer.write_fixed1616(-1.0)
+        writer.write_string("Hi")
+        writer.write_bytes(b"\xAB")
+        self.assertEqual(
+            writer.get_bytes(),
+            bytes.fromhex("fffe" "12345678" "3fc00000" "ffff0000" "0003486900" "ab"),
+        )
+
+    def test_unaligned_fixed_width_writes(self):
+        writer = PacketWriter()
+        writer.write_bool(True)
+        writer.write_int16(0x1234)
+        writer.write_int32(-1)
+        writer.write_bits(0b101, 3)
+        self.assertEqual(writer.get_bytes(), bytes.fromhex("891a7fffffffd0"))
+
+
+class UpdateArrayBytesTest(unittest.TestCase):
+    def test_get_bytes_matches_reference(self):
+        self.assertEqual(_digest(_build_update_packets(UPDATE_SEED)), UPDATE_DIGEST)
+
+    def test_record_cache_does_not_change_bytes(self):
+        self.assertEqual(
+            _build_update_packets(UPDATE_SEED, record_cache={}),
+            _build_update_packets(UPDATE_SEED),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()